@@ -0,0 +1,49 @@
+"""
+HTTP Session
+
+Provides a single HTTP connection pool shared by all node agent subsystems.
+"""
+
+import logging
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Process-wide session, created on first use inside the running event loop
+_session: Optional[aiohttp.ClientSession] = None
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Get the shared HTTP session, creating it on first use.
+    
+    Sharing one session lets every subsystem reuse the same keep-alive
+    connections, DNS cache and TLS sessions.
+    
+    Returns:
+        aiohttp.ClientSession: Shared HTTP session
+    """
+    global _session
+    
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=64,
+                limit_per_host=32,
+                enable_cleanup_closed=True,
+                ttl_dns_cache=300,
+                keepalive_timeout=75
+            )
+        )
+        logger.debug("Created shared HTTP session")
+    
+    return _session
+
+async def close_http_session():
+    """Close the shared HTTP session, if one was created."""
+    global _session
+    
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -5,17 +5,139 @@ Handles communication with the GoPine Job Server via HTTP and WebSockets.
 """
 
 import asyncio
-import json
+import itertools
 import logging
-import uuid
+import secrets
+import socket
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
 
-import requests
+import aiohttp
+import orjson
 import websockets
+from websockets.extensions.permessage_deflate import ClientPerMessageDeflateFactory
+
+from gopine_node_agent.api.http_session import get_http_session
 
 logger = logging.getLogger(__name__)
 
+# Log method for each system notification severity
+SEVERITY_LOGGERS = {
+    "critical": logger.critical,
+    "error": logger.error,
+    "warning": logger.warning,
+    "info": logger.info
+}
+
+# Window for coalescing outbound heartbeats/status updates into one frame
+BATCH_WINDOW_SECONDS = 0.001
+MAX_BATCH_SIZE = 64
+
+# Intermediate job status updates are coalesced per job over this window;
+# final statuses are sent immediately
+STATUS_COALESCE_SECONDS = 0.05
+FINAL_JOB_STATUSES = frozenset({"completed", "failed"})
+
+# Heartbeat load percentages are compared in steps of this size, so that
+# jitter alone doesn't force a full heartbeat
+HEARTBEAT_LOAD_STEP = 10
+
+# How long important messages wait for a reconnecting WebSocket before
+# falling back to HTTP
+WS_READY_GRACE_SECONDS = 0.1
+
+# Largest WebSocket message, before compression; bigger results go over HTTP.
+# Frames are compressed with permessage-deflate, so JSON results shrink 5-10x
+# on the wire.
+WS_MAX_MESSAGE_SIZE = 10 * 1024 * 1024
+
+# String fields of a job result longer than this are truncated
+MAX_RESULT_STRING_LENGTH = 10000
+
+# Bound on cached "Job <status> at <progress>%" strings
+STATUS_MESSAGE_CACHE_SIZE = 512
+
+# Message IDs are a random per-process prefix plus a counter
+_message_id_prefix = secrets.token_hex(8)
+_message_id_counter = itertools.count()
+
+def new_message_id() -> str:
+    """
+    Get a message ID that is unique for the lifetime of this process.
+    
+    Returns:
+        str: Message ID such as "3f9a0c1e2b4d6f80-42"
+    """
+    return f"{_message_id_prefix}-{next(_message_id_counter)}"
+
+# (epoch second, ISO-formatted second) of the last timestamp produced
+_timestamp_cache = (0, "")
+
+def utc_now_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with microseconds.
+    
+    The date/time part is formatted at most once per second and reused,
+    only the fractional part is formatted on every call.
+    
+    Returns:
+        str: Timestamp such as "2024-01-31T12:00:00.123456"
+    """
+    global _timestamp_cache
+    
+    seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+    if seconds != _timestamp_cache[0]:
+        _timestamp_cache = (seconds, datetime.utcfromtimestamp(seconds).isoformat())
+    
+    return f"{_timestamp_cache[1]}.{nanoseconds // 1000:06d}"
+
+@dataclass
+class JobStatusPayload:
+    """Payload of a job status update message."""
+    
+    __slots__ = ("job_id", "node_id", "status", "progress", "status_message")
+    
+    job_id: str
+    node_id: str
+    status: str
+    progress: float
+    status_message: str
+
+@dataclass
+class JobStatusUpdate:
+    """
+    Job status update message.
+    
+    A slotted dataclass is much cheaper to build than the equivalent nested
+    dicts, and orjson serializes it natively to the same JSON.
+    """
+    
+    __slots__ = ("message_id", "message_type", "timestamp", "sender", "payload")
+    
+    message_id: str
+    message_type: str
+    timestamp: str
+    sender: Dict[str, str]
+    payload: JobStatusPayload
+
+class _TunedClientProtocol(websockets.WebSocketClientProtocol):
+    """
+    WebSocket client protocol that tunes the TCP socket once connected.
+    
+    Heartbeats and status updates are small and latency sensitive, so Nagle's
+    algorithm is disabled, and keepalive probes detect dead peers on idle links.
+    """
+    
+    def connection_made(self, transport):
+        """Set TCP options on the new socket, then start the handshake."""
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        super().connection_made(transport)
+
 class ServerAPI:
     """
     API client for communication with the GoPine Job Server.
@@ -33,7 +155,11 @@ class ServerAPI:
         websocket_url: str,
         node_id: str,
         connection_timeout: int = 10,
-        max_retries: int = 3
+        max_retries: int = 3,
+        ack_timeout: float = 10.0,
+        ws_text_frames: bool = False,
+        session: Optional[aiohttp.ClientSession] = None,
+        status_coalesce_seconds: float = STATUS_COALESCE_SECONDS
     ):
         """
         Initialize the server API client.
@@ -44,48 +170,118 @@ class ServerAPI:
             node_id (str): Unique ID of this node agent
             connection_timeout (int): Connection timeout in seconds
             max_retries (int): Maximum number of retries for failed requests
+            ack_timeout (float): Seconds to wait for a server ack of a WebSocket message
+            ws_text_frames (bool): Send WebSocket messages as text frames instead of
+                binary frames, for servers that require text framing
+            session (Optional[aiohttp.ClientSession]): HTTP session to use (defaults
+                to the shared session from get_http_session)
+            status_coalesce_seconds (float): Window over which intermediate job status
+                updates are coalesced per job (0 sends each one right away)
         """
         self.server_url = server_url
         self.websocket_url = websocket_url
         self.node_id = node_id
         self.connection_timeout = connection_timeout
         self.max_retries = max_retries
+        self.ack_timeout = ack_timeout
+        self.ws_text_frames = ws_text_frames
+        
+        # Sender envelope shared by every outgoing message (never mutated)
+        self._sender = {"id": self.node_id, "type": "node_agent"}
+        self._status_message_cache: Dict[Tuple[str, float], str] = {}
+        
+        # Called with each job assignment the server pushes over the WebSocket
+        self.on_job_assignment: Optional[Callable[[Dict], None]] = None
+        
+        # Handlers for incoming WebSocket messages, by message_type
+        self._message_handlers = {
+            "ack": self._on_ack,
+            "hb_resync": self._on_hb_resync,
+            "job_assignment": self._on_job_assignment,
+            "system_notification": self._on_system_notification
+        }
         
         # WebSocket connection
         self.ws_connection = None
-        self.ws_connected = False
         self.ws_task = None
+        self.ws_connect_task = None
+        self.ws_ready: Optional[asyncio.Event] = None  # Set while connected
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Futures for messages awaiting a server ack, keyed by message_id
+        self.pending_acks: Dict[str, asyncio.Future] = {}
+        
+        # Heartbeat delta tracking: full heartbeats carry a sequence number,
+        # unchanged ones are sent as just that sequence number
+        self._hb_seq = 0
+        self._hb_last_hash = None
+        
+        # time.monotonic() of the last request the server answered successfully
+        self.last_server_contact = float("-inf")
         
-        # Create a session for HTTP requests
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Outbound queue of (message, Optional[Future]) pairs, flushed in batches
+        self.outbound: Optional[asyncio.Queue] = None
+        self.flush_task = None
+        
+        # Latest intermediate status update per job, waiting to be coalesced
+        self._pending_status: Dict[str, JobStatusUpdate] = {}
+        self._pending_status_event: Optional[asyncio.Event] = None
+        self.status_task = None
+        self.status_coalesce_seconds = status_coalesce_seconds
+        
+        # HTTP session; the shared pool is used unless one is injected
+        self.session = session
+        self.http_timeout = aiohttp.ClientTimeout(total=self.connection_timeout)
+        self.http_headers = {
             'Content-Type': 'application/json',
             'User-Agent': f'GoPine-Node-Agent/{self.node_id}'
-        })
+        }
+    
+    @property
+    def ws_connected(self) -> bool:
+        """Whether the WebSocket connection is currently established."""
+        return self.ws_ready is not None and self.ws_ready.is_set()
+    
+    async def close(self):
+        """
+        Close the WebSocket connection.
+        
+        The HTTP session is shared and is closed by its owner.
+        """
+        await self._close_ws()
     
-    async def register_node(self, registration_data: Dict) -> bool:
+    async def register_node(self, registration_data: Union[Dict, bytes]) -> bool:
         """
         Register this node with the server.
         
         Args:
-            registration_data (Dict): Node registration data
+            registration_data (Union[Dict, bytes]): Node registration data, or its
+                pre-encoded JSON bytes
             
         Returns:
             bool: True if registration was successful, False otherwise
         """
         try:
             endpoint = f"{self.server_url}/api/nodes/register"
-            response = await self._http_post(endpoint, registration_data)
             
-            if response.status_code == 200:
+            # Open the WebSocket speculatively in the background while the
+            # registration request is in flight; registration doesn't wait for
+            # it, and it is closed again if registration fails
+            if self.ws_connect_task is None or self.ws_connect_task.done():
+                self.ws_connect_task = asyncio.create_task(self._connect_websocket())
+            
+            try:
+                status, body = await self._http_post(endpoint, registration_data)
+            except Exception:
+                await self._close_ws()
+                raise
+            
+            if status == 200:
                 logger.info("Node registered successfully")
-                
-                # Start WebSocket connection after successful registration
-                await self._ensure_websocket_connection()
-                
                 return True
             else:
-                logger.error("Node registration failed: %s", response.text)
+                logger.error("Node registration failed: %s", body)
+                await self._close_ws()
                 return False
                 
         except Exception as e:
@@ -103,25 +299,58 @@ class ServerAPI:
             bool: True if heartbeat was successful, False otherwise
         """
         try:
-            # Try to send via WebSocket if connected
-            if self.ws_connected:
-                await self._ws_send(heartbeat_data)
+            # Send via WebSocket, fall back to HTTP only if it is down. Sent
+            # directly rather than batched so a failed send reaches the fallback
+            try:
+                await self._ws_send(self._heartbeat_delta(heartbeat_data))
                 return True
+            except ConnectionError:
+                pass
             
-            # Fall back to HTTP
             endpoint = f"{self.server_url}/api/nodes/{self.node_id}/heartbeat"
-            response = await self._http_post(endpoint, heartbeat_data)
+            status, body = await self._http_post(endpoint, heartbeat_data)
             
-            if response.status_code == 200:
+            if status == 200:
                 return True
             else:
-                logger.warning("Heartbeat failed: %s", response.text)
+                logger.warning("Heartbeat failed: %s", body)
                 return False
                 
         except Exception as e:
             logger.error("Error sending heartbeat: %s", str(e))
             return False
     
+    def _heartbeat_delta(self, heartbeat_data: Dict) -> Dict:
+        """
+        Reduce a heartbeat to its sequence number if its state is unchanged.
+        
+        Only the node status, the active job count and the CPU/memory load
+        rounded to HEARTBEAT_LOAD_STEP are compared; the exact live figures
+        change on every heartbeat.
+        
+        Args:
+            heartbeat_data (Dict): Full heartbeat data
+            
+        Returns:
+            Dict: Full heartbeat tagged with a new sequence number, or a
+                lightweight heartbeat carrying only the last sequence number
+        """
+        payload = heartbeat_data.get("payload") or {}
+        load = payload.get("current_load") or {}
+        payload_hash = hash((
+            payload.get("status"),
+            load.get("active_jobs"),
+            round((load.get("cpu_percent") or 0) / HEARTBEAT_LOAD_STEP),
+            round((load.get("memory_percent") or 0) / HEARTBEAT_LOAD_STEP)
+        ))
+        
+        if payload_hash == self._hb_last_hash:
+            return {"message_type": "hb", "seq": self._hb_seq}
+        
+        self._hb_seq += 1
+        self._hb_last_hash = payload_hash
+        return {**heartbeat_data, "seq": self._hb_seq}
+    
     async def request_jobs(self, node_id: str, capacity: int) -> List[Dict]:
         """
         Request jobs from the server.
@@ -142,14 +371,14 @@ class ServerAPI:
                 "capabilities": ["ocr", "pdf_parse"]
             }
             
-            response = await self._http_post(endpoint, data)
+            status, body = await self._http_post(endpoint, data)
             
-            if response.status_code == 200:
-                jobs = response.json().get("jobs", [])
+            if status == 200:
+                jobs = body.get("jobs", []) if isinstance(body, dict) else []
                 logger.info("Received %d job assignment(s) from server", len(jobs))
                 return jobs
             else:
-                logger.warning("Failed to request jobs: %s", response.text)
+                logger.warning("Failed to request jobs: %s", body)
                 return []
                 
         except Exception as e:
@@ -170,42 +399,72 @@ class ServerAPI:
         """
         try:
             # Prepare the status update message
-            status_data = {
-                "message_id": str(uuid.uuid4()),
-                "message_type": "job_status_update",
-                "timestamp": datetime.utcnow().isoformat(),
-                "sender": {
-                    "id": self.node_id,
-                    "type": "node_agent"
-                },
-                "payload": {
-                    "job_id": job_id,
-                    "node_id": self.node_id,
-                    "status": status,
-                    "progress": progress,
-                    "status_message": f"Job {status} at {progress:.1f}%"
-                }
-            }
+            status_data = JobStatusUpdate(
+                message_id=new_message_id(),
+                message_type="job_status_update",
+                timestamp=utc_now_iso(),
+                sender=self._sender,
+                payload=JobStatusPayload(
+                    job_id=job_id,
+                    node_id=self.node_id,
+                    status=status,
+                    progress=progress,
+                    status_message=self._status_message(status, progress)
+                )
+            )
             
-            # Try to send via WebSocket if connected
-            if self.ws_connected:
-                await self._ws_send(status_data)
+            # Send via WebSocket, fall back to HTTP only if it is down
+            try:
+                if status in FINAL_JOB_STATUSES:
+                    # Drop any older progress update that isn't queued yet; queued
+                    # ones go out first, as the queue is sent in order. Waits for
+                    # the send so a failure reaches the HTTP fallback.
+                    self._pending_status.pop(job_id, None)
+                    await self._wait_ws_ready(WS_READY_GRACE_SECONDS)
+                    await self._ws_enqueue(status_data, wait=True)
+                elif self.status_coalesce_seconds <= 0:
+                    await self._ws_enqueue(status_data)
+                else:
+                    self._coalesce_status(job_id, status_data)
                 return True
+            except ConnectionError:
+                pass
             
-            # Fall back to HTTP
             endpoint = f"{self.server_url}/api/jobs/{job_id}/status"
-            response = await self._http_post(endpoint, status_data)
+            status_code, body = await self._http_post(endpoint, status_data)
             
-            if response.status_code == 200:
+            if status_code == 200:
                 return True
             else:
-                logger.warning("Failed to update job status: %s", response.text)
+                logger.warning("Failed to update job status: %s", body)
                 return False
                 
         except Exception as e:
             logger.error("Error updating job status: %s", str(e))
             return False
     
+    def _status_message(self, status: str, progress: float) -> str:
+        """
+        Get the human-readable message for a job status update.
+        
+        Args:
+            status (str): Job status
+            progress (float): Progress percentage (0-100)
+            
+        Returns:
+            str: Status message
+        """
+        key = (status, progress)
+        message = self._status_message_cache.get(key)
+        
+        if message is None:
+            if len(self._status_message_cache) >= STATUS_MESSAGE_CACHE_SIZE:
+                self._status_message_cache.clear()
+            message = f"Job {status} at {progress:.1f}%"
+            self._status_message_cache[key] = message
+        
+        return message
+    
     async def send_job_result(self, job_id: str, result_data: Dict) -> bool:
         """
         Send job result to the server.
@@ -220,172 +479,473 @@ class ServerAPI:
         try:
             # Prepare the result message
             message = {
-                "message_id": str(uuid.uuid4()),
+                "message_id": new_message_id(),
                 "message_type": "job_result",
-                "timestamp": datetime.utcnow().isoformat(),
-                "sender": {
-                    "id": self.node_id,
-                    "type": "node_agent"
-                },
+                "timestamp": utc_now_iso(),
+                "sender": self._sender,
                 "payload": {
                     "job_id": job_id,
                     "node_id": self.node_id,
                     "status": result_data.get("status", "completed"),
-                    "result": result_data.get("result", {}),
+                    "result": self._truncate_result(result_data.get("result", {})),
                     "processing_stats": result_data.get("processing_stats", {})
                 }
             }
             
-            # For large results, adjust the payload size
-            if "text_content" in message["payload"].get("result", {}):
-                text_content = message["payload"]["result"]["text_content"]
-                if text_content and len(text_content) > 10000:
-                    # Truncate large text content
-                    message["payload"]["result"]["text_content"] = (
-                        text_content[:10000] + "... [truncated]"
-                    )
-            
-            # Try to send via WebSocket if connected and if the payload is not too large
-            payload_size = len(json.dumps(message))
-            if self.ws_connected and payload_size < 1000000:  # 1MB limit
-                await self._ws_send(message)
-                return True
+            # Encode once: the same bytes are size-checked and sent on either transport
+            encoded = orjson.dumps(message)
+            
+            # Send via WebSocket if the payload is not too large and wait for the
+            # server ack; fall back to HTTP if the connection is down or unacked
+            if len(encoded) < WS_MAX_MESSAGE_SIZE and await self._wait_ws_ready(WS_READY_GRACE_SECONDS):
+                try:
+                    await self._ws_request(message["message_id"], encoded)
+                    return True
+                except (ConnectionError, asyncio.TimeoutError) as e:
+                    logger.debug("Job result for %s not delivered over WebSocket: %s", job_id, e)
             
-            # Fall back to HTTP
             endpoint = f"{self.server_url}/api/jobs/{job_id}/result"
-            response = await self._http_post(endpoint, message)
+            status, body = await self._http_post(endpoint, encoded)
             
-            if response.status_code == 200:
+            if status == 200:
                 return True
             else:
-                logger.warning("Failed to send job result: %s", response.text)
+                logger.warning("Failed to send job result: %s", body)
                 return False
                 
         except Exception as e:
             logger.error("Error sending job result: %s", str(e), exc_info=True)
             return False
     
+    async def send_job_results(self, results: Dict[str, Dict]) -> Dict[str, bool]:
+        """
+        Send several job results to the server concurrently.
+        
+        Args:
+            results (Dict[str, Dict]): Job result data keyed by job ID
+            
+        Returns:
+            Dict[str, bool]: Whether each job's result was successfully sent
+        """
+        job_ids = list(results)
+        outcomes = await asyncio.gather(
+            *(self.send_job_result(job_id, results[job_id]) for job_id in job_ids),
+            return_exceptions=True
+        )
+        
+        sent = {}
+        for job_id, outcome in zip(job_ids, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error("Error sending job result for %s: %s", job_id, outcome)
+                outcome = False
+            sent[job_id] = outcome
+        
+        return sent
+    
+    def _truncate_result(self, result: Dict) -> Dict:
+        """
+        Truncate oversized string fields of a job result in a single pass.
+        
+        The job's own result dict is left untouched so a failed send can be
+        retried with the full data.
+        
+        Args:
+            result (Dict): Job result
+            
+        Returns:
+            Dict: Result safe to embed in a message, with the names of the
+                truncated fields under "_truncated_fields"
+        """
+        truncated = {}
+        truncated_fields = []
+        
+        for key, value in result.items():
+            if isinstance(value, str) and len(value) > MAX_RESULT_STRING_LENGTH:
+                truncated[key] = value[:MAX_RESULT_STRING_LENGTH] + "... [truncated]"
+                truncated_fields.append(key)
+            else:
+                truncated[key] = value
+        
+        if truncated_fields:
+            truncated["_truncated_fields"] = truncated_fields
+        
+        return truncated
+    
     async def _ensure_websocket_connection(self):
         """Ensure there's an active WebSocket connection to the server."""
         if self.ws_connected:
             return
         
-        # Start WebSocket connection in the background
+        # Everything below is bound to the loop we're running in
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        if self.ws_ready is None:
+            self.ws_ready = asyncio.Event()
+        if self.outbound is None:
+            self.outbound = asyncio.Queue()
+        if self._pending_status_event is None:
+            self._pending_status_event = asyncio.Event()
+        
+        # Start WebSocket connection and the batch flusher in the background
         if self.ws_task is None or self.ws_task.done():
             self.ws_task = asyncio.create_task(self._websocket_loop())
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._batch_flusher())
+        if self.status_task is None or self.status_task.done():
+            self.status_task = asyncio.create_task(self._status_drainer())
+    
+    async def _connect_websocket(self) -> bool:
+        """
+        Start the WebSocket connection and wait for it to be established.
+        
+        Returns:
+            bool: True if connected within connection_timeout, False otherwise
+        """
+        await self._ensure_websocket_connection()
+        return await self._wait_ws_ready(self.connection_timeout)
+    
+    async def _wait_ws_ready(self, timeout: float) -> bool:
+        """
+        Wait briefly for the WebSocket to be connected.
+        
+        Args:
+            timeout (float): Maximum time to wait in seconds
+            
+        Returns:
+            bool: True if the WebSocket is connected, False otherwise
+        """
+        if self.ws_ready is None:
+            return False
+        if self.ws_ready.is_set():
+            return True
+        
+        try:
+            await asyncio.wait_for(self.ws_ready.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _close_ws(self):
+        """Stop the WebSocket connection and its background send tasks."""
+        tasks = [
+            task for task in (self.ws_connect_task, self.status_task, self.flush_task, self.ws_task)
+            if task is not None and not task.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     
     async def _websocket_loop(self):
-        """Main WebSocket connection loop."""
+        """
+        Main WebSocket connection loop.
+        
+        Iterating over websockets.connect() reconnects automatically, backing
+        off exponentially with jitter while the server is unreachable.
+        """
         logger.info("Starting WebSocket connection to %s", self.websocket_url)
         
-        while True:
-            try:
-                # Connect to WebSocket server
-                async with websockets.connect(
-                    f"{self.websocket_url}/nodes/{self.node_id}",
-                    ping_interval=30,
-                    ping_timeout=10,
-                    close_timeout=5
-                ) as websocket:
-                    logger.info("WebSocket connection established")
-                    self.ws_connection = websocket
-                    self.ws_connected = True
-                    
-                    # Listen for messages from the server
-                    while True:
-                        try:
-                            message = await websocket.recv()
-                            await self._handle_websocket_message(message)
-                        except websockets.exceptions.ConnectionClosed:
-                            logger.warning("WebSocket connection closed by server")
-                            break
+        async for websocket in websockets.connect(
+            f"{self.websocket_url}/nodes/{self.node_id}",
+            open_timeout=self.connection_timeout,
+            create_protocol=_TunedClientProtocol,
+            ping_interval=30,
+            ping_timeout=10,
+            close_timeout=5,
+            max_size=WS_MAX_MESSAGE_SIZE,
+            compression="deflate",
+            extensions=[
+                ClientPerMessageDeflateFactory(
+                    server_max_window_bits=15,
+                    client_max_window_bits=15,
+                    compress_settings={"memLevel": 5}
+                )
+            ]
+        ):
+            logger.info("WebSocket connection established")
+            self.ws_connection = websocket
+            self.ws_ready.set()
+            
+            # A new connection always starts with a full heartbeat
+            self._hb_last_hash = None
             
+            try:
+                # Listen for messages from the server
+                async for message in websocket:
+                    await self._handle_websocket_message(message)
+                logger.warning("WebSocket connection closed by server")
+            except websockets.exceptions.ConnectionClosed:
+                logger.warning("WebSocket connection closed by server")
             except Exception as e:
                 logger.error("WebSocket error: %s", str(e), exc_info=True)
-            
-            # Connection failed or closed, reset state
-            self.ws_connection = None
-            self.ws_connected = False
-            
-            # Wait before reconnecting
-            logger.info("Reconnecting WebSocket in 10 seconds...")
-            await asyncio.sleep(10)
+            finally:
+                # Connection closed, reset state before reconnecting
+                self.ws_connection = None
+                self.ws_ready.clear()
+                self._fail_pending_acks()
     
-    async def _handle_websocket_message(self, message_str: str):
+    async def _handle_websocket_message(self, message_str: Union[str, bytes]):
         """
         Handle incoming WebSocket messages from the server.
         
         Args:
-            message_str (str): Raw message string
+            message_str (Union[str, bytes]): Raw message string
         """
         try:
-            message = json.loads(message_str)
+            message = orjson.loads(message_str)
             
             message_type = message.get("message_type")
             logger.debug("Received WebSocket message: %s", message_type)
             
-            # Handle different message types
-            if message_type == "job_assignment":
-                # New job assignment
-                pass  # This would be handled by the main agent loop
-                
-            elif message_type == "system_notification":
-                # System notification
-                notification = message.get("payload", {})
-                severity = notification.get("severity", "info")
-                msg = notification.get("message", "No message")
-                
-                if severity == "critical":
-                    logger.critical("SYSTEM NOTIFICATION: %s", msg)
-                elif severity == "error":
-                    logger.error("SYSTEM NOTIFICATION: %s", msg)
-                elif severity == "warning":
-                    logger.warning("SYSTEM NOTIFICATION: %s", msg)
-                else:
-                    logger.info("SYSTEM NOTIFICATION: %s", msg)
-            
-            # Other message types can be added here
+            # Dispatch to the handler for this message type
+            await self._message_handlers.get(message_type, self._on_unknown_message)(message)
             
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error("Failed to parse WebSocket message: %s", message_str)
         except Exception as e:
             logger.error("Error handling WebSocket message: %s", str(e), exc_info=True)
     
-    async def _ws_send(self, data: Dict):
+    async def _on_ack(self, message: Dict):
+        """Resolve the pending future of a message the server acknowledged."""
+        ack_id = message.get("payload", {}).get("message_id")
+        self.last_server_contact = time.monotonic()
+        future = self.pending_acks.pop(ack_id, None)
+        if future is not None and not future.done():
+            future.set_result(message)
+    
+    async def _on_hb_resync(self, message: Dict):
+        """Server doesn't know our last heartbeat sequence, send a full one next."""
+        self._hb_last_hash = None
+    
+    async def _on_job_assignment(self, message: Dict):
+        """Hand a new job assignment over to the main agent loop."""
+        if self.on_job_assignment:
+            self.on_job_assignment(message)
+    
+    async def _on_system_notification(self, message: Dict):
+        """Log a system notification at its severity level."""
+        notification = message.get("payload", {})
+        severity = notification.get("severity", "info")
+        msg = notification.get("message", "No message")
+        
+        SEVERITY_LOGGERS.get(severity, logger.info)("SYSTEM NOTIFICATION: %s", msg)
+    
+    async def _on_unknown_message(self, message: Dict):
+        """Ignore message types this agent doesn't handle."""
+        pass
+    
+    async def _ws_send(self, data: Union[Dict, JobStatusUpdate, bytes]):
         """
         Send data via WebSocket connection.
         
         Args:
-            data (Dict): Data to send
+            data (Union[Dict, JobStatusUpdate, bytes]): Data to send, or its
+                pre-encoded JSON bytes
+            
+        Raises:
+            ConnectionError: If the WebSocket connection is not established or closed
+            ValueError: If the encoded message exceeds WS_MAX_MESSAGE_SIZE
         """
         if not self.ws_connected or self.ws_connection is None:
             raise ConnectionError("WebSocket connection not established")
         
-        await self.ws_connection.send(json.dumps(data))
+        if not isinstance(data, bytes):
+            data = orjson.dumps(data)
+        
+        if len(data) > WS_MAX_MESSAGE_SIZE:
+            raise ValueError(f"WebSocket message too large: {len(data)} bytes")
+        
+        try:
+            # orjson bytes go out as a binary frame without another copy; text
+            # frames need a single decode (orjson never escapes non-ASCII)
+            await self.ws_connection.send(data.decode("utf-8") if self.ws_text_frames else data)
+        except websockets.exceptions.ConnectionClosed as e:
+            raise ConnectionError(f"WebSocket connection closed: {e}") from e
     
-    async def _http_post(self, url: str, data: Dict) -> requests.Response:
+    async def _ws_enqueue(self, data: Union[Dict, JobStatusUpdate], wait: bool = False):
+        """
+        Queue a small message to be sent in the next WebSocket batch.
+        
+        Args:
+            data (Union[Dict, JobStatusUpdate]): Data to send
+            wait (bool): Wait until the batch carrying the message is sent
+            
+        Raises:
+            ConnectionError: If the WebSocket connection is not established, or
+                when waiting, if the batch could not be sent within ack_timeout
+        """
+        if not self.ws_connected or self.outbound is None:
+            raise ConnectionError("WebSocket connection not established")
+        
+        if not wait:
+            await self.outbound.put((data, None))
+            return
+        
+        sent = self._loop.create_future()
+        await self.outbound.put((data, sent))
+        try:
+            await asyncio.wait_for(sent, timeout=self.ack_timeout)
+        except asyncio.TimeoutError as e:
+            raise ConnectionError("WebSocket batch not sent in time") from e
+    
+    async def _batch_flusher(self):
+        """
+        Drain the outbound queue into batched WebSocket frames.
+        
+        Waits BATCH_WINDOW_SECONDS after the first queued message so that
+        concurrent heartbeats/status updates share a single frame and a
+        single JSON encode. Messages queued with a future have it resolved
+        once their batch is sent, or failed with ConnectionError.
+        """
+        while True:
+            entries = [await self.outbound.get()]
+            await asyncio.sleep(BATCH_WINDOW_SECONDS)
+            
+            while len(entries) < MAX_BATCH_SIZE and not self.outbound.empty():
+                entries.append(self.outbound.get_nowait())
+            
+            messages = [data for data, _ in entries]
+            try:
+                if len(messages) == 1:
+                    await self._ws_send(messages[0])
+                else:
+                    await self._ws_send({"message_type": "batch", "messages": messages})
+                error = None
+            except Exception as e:
+                logger.warning("Failed to send batch of %d message(s): %s", len(messages), str(e))
+                error = ConnectionError(f"WebSocket batch not sent: {e}")
+            
+            for _, sent in entries:
+                if sent is not None and not sent.done():
+                    if error is None:
+                        sent.set_result(None)
+                    else:
+                        sent.set_exception(error)
+    
+    def _coalesce_status(self, job_id: str, status_data: JobStatusUpdate):
+        """
+        Record an intermediate job status update, replacing any unsent one.
+        
+        Args:
+            job_id (str): ID of the job
+            status_data (JobStatusUpdate): Status update message
+            
+        Raises:
+            ConnectionError: If the WebSocket connection is not established
+        """
+        if not self.ws_connected or self._pending_status_event is None:
+            raise ConnectionError("WebSocket connection not established")
+        
+        self._pending_status[job_id] = status_data
+        self._pending_status_event.set()
+    
+    async def _status_drainer(self):
+        """
+        Send the latest coalesced status update of each job.
+        
+        Wakes on the first pending update, waits status_coalesce_seconds
+        for more to accumulate, then queues one update per job so they
+        go out in a single batch frame.
+        """
+        while True:
+            await self._pending_status_event.wait()
+            await asyncio.sleep(self.status_coalesce_seconds)
+            self._pending_status_event.clear()
+            
+            pending, self._pending_status = self._pending_status, {}
+            for job_id, status_data in pending.items():
+                try:
+                    await self._ws_enqueue(status_data)
+                except ConnectionError:
+                    logger.warning("Dropped status update for job %s, WebSocket disconnected",
+                                   job_id)
+    
+    async def _ws_request(self, message_id: str, data: Union[Dict, bytes]) -> Dict:
+        """
+        Send data via WebSocket and wait for the server to acknowledge it.
+        
+        Args:
+            message_id (str): ID of the message the server will ack
+            data (Union[Dict, bytes]): Data to send, or its pre-encoded JSON bytes
+            
+        Returns:
+            Dict: Ack message from the server
+            
+        Raises:
+            ConnectionError: If the WebSocket is down or drops before the ack
+            asyncio.TimeoutError: If no ack arrives within ack_timeout
+        """
+        if self._loop is None:
+            raise ConnectionError("WebSocket connection not established")
+        
+        future = self._loop.create_future()
+        self.pending_acks[message_id] = future
+        
+        try:
+            await self._ws_send(data)
+            return await asyncio.wait_for(future, timeout=self.ack_timeout)
+        finally:
+            self.pending_acks.pop(message_id, None)
+    
+    def _fail_pending_acks(self):
+        """Fail all messages still waiting for an ack after the WebSocket dropped."""
+        pending, self.pending_acks = self.pending_acks, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("WebSocket connection lost before ack"))
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the HTTP session for requests to the server.
+        
+        Returns:
+            aiohttp.ClientSession: Injected session, or the shared session
+        """
+        return self.session or get_http_session()
+    
+    async def _read_body(self, response: aiohttp.ClientResponse) -> Any:
+        """
+        Read an HTTP response body, decoding JSON when the server sends it.
+        
+        Args:
+            response (aiohttp.ClientResponse): HTTP response
+            
+        Returns:
+            Any: Decoded JSON body, or the raw text otherwise
+        """
+        if response.content_type == "application/json":
+            try:
+                return await response.json(loads=orjson.loads)
+            except (aiohttp.ContentTypeError, orjson.JSONDecodeError):
+                pass
+        return await response.text()
+    
+    async def _http_post(self, url: str, data: Union[Dict, bytes]) -> Tuple[int, Any]:
         """
         Send HTTP POST request to the server.
         
         Args:
             url (str): Endpoint URL
-            data (Dict): Data to send
+            data (Union[Dict, bytes]): Data to send, or its pre-encoded JSON bytes
             
         Returns:
-            requests.Response: HTTP response
-        """
-        # Convert the async execution to run in a separate thread
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.session.post(
-                url,
-                json=data,
-                timeout=self.connection_timeout
-            )
-        )
+            Tuple[int, Any]: HTTP status code and response body
+        """
+        if not isinstance(data, bytes):
+            data = orjson.dumps(data)
+        
+        async with self._get_session().post(
+            url,
+            data=data,
+            headers=self.http_headers,
+            timeout=self.http_timeout
+        ) as response:
+            body = await self._read_body(response)
+        
+        if response.status == 200:
+            self.last_server_contact = time.monotonic()
+        return response.status, body
     
-    async def _http_get(self, url: str) -> requests.Response:
+    async def _http_get(self, url: str) -> Tuple[int, Any]:
         """
         Send HTTP GET request to the server.
         
@@ -393,14 +953,15 @@ class ServerAPI:
             url (str): Endpoint URL
             
         Returns:
-            requests.Response: HTTP response
-        """
-        # Convert the async execution to run in a separate thread
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.session.get(
-                url,
-                timeout=self.connection_timeout
-            )
-        )
\ No newline at end of file
+            Tuple[int, Any]: HTTP status code and response body
+        """
+        async with self._get_session().get(
+            url,
+            headers=self.http_headers,
+            timeout=self.http_timeout
+        ) as response:
+            body = await self._read_body(response)
+        
+        if response.status == 200:
+            self.last_server_contact = time.monotonic()
+        return response.status, body
@@ -7,6 +7,7 @@ Command-line interface for the GoPine Node Agent.
 
 import argparse
 import logging
+import multiprocessing
 import os
 import signal
 import sys
@@ -15,7 +16,6 @@ from typing import Optional
 from gopine_node_agent import __version__
 from gopine_node_agent.core.agent import NodeAgent
 from gopine_node_agent.core.logger import setup_logging
-from gopine_node_agent.windows.service import run_as_service, install_service, uninstall_service
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +97,30 @@ def handle_signals():
     if hasattr(signal, "SIGQUIT"):
         signal.signal(signal.SIGQUIT, signal_handler)
 
+def install_uvloop():
+    """Install uvloop as the asyncio event loop policy on POSIX, if it's available."""
+    if os.name == "nt":
+        return
+    
+    try:
+        import uvloop
+        uvloop.install()
+        logger.debug("Using uvloop event loop")
+    except ImportError:
+        logger.debug("uvloop not available, using the default asyncio event loop")
+
+def limit_ocr_threads():
+    """
+    Keep each tesseract to one OpenMP thread on multi-core machines.
+    
+    OCR jobs recognize pages in parallel, one per core, so tesseract's own
+    threads would only oversubscribe the CPU. The environment is
+    process-wide and read when tesseract is loaded, so it's set once here
+    before any job runs; an explicit OMP_THREAD_LIMIT is left untouched.
+    """
+    if (os.cpu_count() or 1) > 1:
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 def main():
     """Main entry point for the application."""
     args = parse_args()
@@ -105,14 +129,20 @@ def main():
     log_level = getattr(logging, args.log_level)
     setup_logging(log_level)
     
-    # Handle Windows service commands
-    if args.install_service:
-        return install_service()
-    
-    if args.uninstall_service:
-        return uninstall_service()
+    # Before any job (including ones run by the Windows service) loads tesseract
+    limit_ocr_threads()
     
-    if args.run_as_service:
+    # Handle Windows service commands; pywin32 is only loaded for them, it
+    # takes a while to import
+    if args.install_service or args.uninstall_service or args.run_as_service:
+        from gopine_node_agent.windows.service import run_as_service, install_service, uninstall_service
+        
+        if args.install_service:
+            return install_service()
+        
+        if args.uninstall_service:
+            return uninstall_service()
+        
         return run_as_service()
     
     # Normal operation as console application
@@ -128,6 +158,9 @@ def main():
             node_id=args.node_id
         )
         
+        # Use the faster libuv-based event loop where available
+        install_uvloop()
+        
         # Run the agent (blocking call)
         agent.run()
         
@@ -138,4 +171,6 @@ def main():
     return 0
 
 if __name__ == "__main__":
+    # Lets worker processes (see PDFParseJob) start from a frozen executable
+    multiprocessing.freeze_support()
     sys.exit(main())
\ No newline at end of file
@@ -6,26 +6,34 @@ and communication with the GoPine Job Server.
 """
 
 import asyncio
-import json
 import logging
 import os
 import platform
+import random
 import socket
 import time
-import uuid
-from datetime import datetime
+from datetime import datetime, time as dt_time
 from typing import Dict, List, Optional
 
+import orjson
 import psutil
 
-from gopine_node_agent.api.server_api import ServerAPI
-from gopine_node_agent.core.config import Config, load_config
-from gopine_node_agent.core.job_manager import JobManager
+from gopine_node_agent.api.http_session import close_http_session
+from gopine_node_agent.api.server_api import ServerAPI, new_message_id, utc_now_iso
+from gopine_node_agent.core.config import load_config
+from gopine_node_agent.core.job_manager import JobManager, JobManagerSnapshot
 from gopine_node_agent.core.resource_monitor import ResourceMonitor
-from gopine_node_agent.utils.system_info import get_system_info
+from gopine_node_agent.utils.system_info import get_ip_address, get_system_info
 
 logger = logging.getLogger(__name__)
 
+# Day names indexed by datetime.weekday(), avoiding a locale-dependent strftime
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Registration retries back off exponentially from 1s up to this cap, with
+# +/-25% jitter so a fleet of nodes doesn't retry in lockstep
+REGISTRATION_BACKOFF_MAX_SECONDS = 30
+
 class NodeAgent:
     """
     Main agent class for the GoPine distributed computing system.
@@ -55,46 +63,113 @@ class NodeAgent:
             node_id (Optional[str]): Unique ID for this node (if not specified, hostname will be used)
         """
         self.config = load_config(config_path)
+        node_config = self.config.node_agent
         
         # Override config with command line arguments if provided
         if work_dir:
-            self.config.node_agent.job_processing.work_dir = work_dir
+            node_config.job_processing.work_dir = work_dir
         if server_url:
-            self.config.node_agent.connection.server_url = server_url
+            node_config.connection.server_url = server_url
         
         # Ensure work directory exists
-        self.work_dir = self.config.node_agent.job_processing.work_dir
+        self.work_dir = node_config.job_processing.work_dir
         os.makedirs(self.work_dir, exist_ok=True)
         
         # Set up node identity
-        self.node_id = node_id or self.config.node_agent.get('node_id') or socket.gethostname()
         self.hostname = socket.gethostname()
+        self.node_id = node_id or node_config.node_id or self.hostname
+        
+        # System facts that don't change while the agent runs
+        self.system_info = get_system_info()
+        self.ip_address = self.system_info.get("network", {}).get("ip_address") or get_ip_address()
+        self.version = node_config.version
+        self._static_resource_info = {
+            "cpu_cores": psutil.cpu_count(logical=True),
+            "cpu_model": platform.processor(),
+            "total_memory_mb": psutil.virtual_memory().total >> 20,
+            "operating_system": f"{platform.system()} {platform.release()}"
+        }
+        
+        # Settings read by the main loop
+        connection = node_config.connection
+        self._server_url = connection.server_url
+        self._heartbeat_interval = connection.heartbeat_interval_seconds
+        self._job_poll_interval = connection.job_poll_interval_seconds
+        
+        # Processing window, parsed once rather than on every main loop iteration
+        scheduling = node_config.scheduling
+        self._working_hours_only = scheduling.working_hours_only
+        self._working_days = frozenset(scheduling.working_days)
+        self._work_start = dt_time.fromisoformat(scheduling.working_hours.start)
+        self._work_end = dt_time.fromisoformat(scheduling.working_hours.end)
+        self._available_hours = self._get_available_hours()
+        
+        # Registration message parts that never change, encoded to JSON once; only
+        # resource info, the message ID and timestamp are encoded per registration
+        registration_template = {
+            "message_type": "node_registration",
+            "sender": {
+                "id": self.node_id,
+                "type": "node_agent"
+            },
+            "payload": {
+                "node_id": self.node_id,
+                "hostname": self.hostname,
+                "ip_address": self.ip_address,
+                "version": self.version,
+                "capabilities": [
+                    "ocr",
+                    "pdf_parse"
+                ],
+                "time_restrictions": {
+                    "available_hours": self._available_hours
+                }
+            }
+        }
+        # '{..., "payload": {...' left open for "resource_info" and the dynamic fields
+        self._registration_prefix = (
+            orjson.dumps(registration_template)[:-2] + b',"resource_info":'
+        )
         
         # Initialize API connection to server
         self.api = ServerAPI(
-            server_url=self.config.node_agent.connection.server_url,
-            websocket_url=self.config.node_agent.connection.websocket_url,
-            node_id=self.node_id
+            server_url=self._server_url,
+            websocket_url=connection.websocket_url,
+            node_id=self.node_id,
+            status_coalesce_seconds=connection.status_batch_delay_ms / 1000
         )
         
         # Initialize components
+        resources = node_config.resources
         self.resource_monitor = ResourceMonitor(
-            max_cpu_percent=self.config.node_agent.resources.max_cpu_percent,
-            max_memory_percent=self.config.node_agent.resources.max_memory_percent,
-            min_free_disk_space_mb=self.config.node_agent.resources.min_free_disk_space_mb
+            max_cpu_percent=resources.max_cpu_percent,
+            max_memory_percent=resources.max_memory_percent,
+            min_free_disk_space_mb=resources.min_free_disk_space_mb,
+            disk_path=self.work_dir
         )
         
         self.job_manager = JobManager(
             work_dir=self.work_dir,
-            concurrent_jobs=self.config.node_agent.resources.concurrent_jobs,
-            cleanup_after_job=self.config.node_agent.job_processing.cleanup_after_job
+            concurrent_jobs=resources.concurrent_jobs,
+            cleanup_after_job=node_config.job_processing.cleanup_after_job,
+            max_queue_size=node_config.job_processing.max_queue_size,
+            on_job_finished=self._on_job_finished
         )
         
+        # Jobs pushed by the server over the WebSocket are queued for the main loop
+        self.api.on_job_assignment = self._on_job_pushed
+        
         # State tracking
         self.is_running = False
         self.is_registered = False
-        self.last_heartbeat_time = 0
-        self.system_info = get_system_info()
+        self.last_heartbeat_time = float("-inf")  # Event loop (monotonic) time
+        
+        # Main loop wakeup (created in main_loop, it must be bound to the running loop)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._pushed_jobs: Optional[asyncio.Queue] = None
+        self._poll_jobs = True  # Ask the server for jobs over HTTP on the next iteration
         
     async def register_with_server(self) -> bool:
         """
@@ -106,37 +181,29 @@ class NodeAgent:
         logger.info("Registering node with server...")
         
         try:
-            # Prepare registration data
-            registration_data = {
-                "message_id": str(uuid.uuid4()),
-                "message_type": "node_registration",
-                "timestamp": datetime.utcnow().isoformat(),
-                "sender": {
-                    "id": self.node_id,
-                    "type": "node_agent"
-                },
-                "payload": {
-                    "node_id": self.node_id,
-                    "hostname": self.hostname,
-                    "ip_address": socket.gethostbyname(socket.gethostname()),
-                    "version": self.config.node_agent.get("version", "0.1.0"),
-                    "capabilities": [
-                        "ocr",
-                        "pdf_parse"
-                    ],
-                    "resource_info": {
-                        "cpu_cores": psutil.cpu_count(logical=True),
-                        "cpu_model": platform.processor(),
-                        "total_memory_mb": psutil.virtual_memory().total // (1024 * 1024),
-                        "available_memory_mb": psutil.virtual_memory().available // (1024 * 1024),
-                        "available_disk_space_mb": psutil.disk_usage(self.work_dir).free // (1024 * 1024),
-                        "operating_system": f"{platform.system()} {platform.release()}"
-                    },
-                    "time_restrictions": {
-                        "available_hours": self._get_available_hours()
-                    }
-                }
+            # psutil reads /proc (or calls into the OS) synchronously, keep it off
+            # the event loop
+            loop = asyncio.get_running_loop()
+            memory, disk = await asyncio.gather(
+                loop.run_in_executor(None, self.resource_monitor.get_virtual_memory),
+                loop.run_in_executor(None, self.resource_monitor.get_disk_usage, self.work_dir)
+            )
+            
+            # Prepare registration data by completing the pre-encoded static part
+            resource_info = {
+                **self._static_resource_info,
+                "available_memory_mb": memory.available >> 20,
+                "available_disk_space_mb": disk.free >> 20
             }
+            registration_data = b"".join((
+                self._registration_prefix,
+                orjson.dumps(resource_info),
+                b'},"message_id":',
+                orjson.dumps(new_message_id()),
+                b',"timestamp":',
+                orjson.dumps(utc_now_iso()),
+                b"}"
+            ))
             
             # Send registration to server
             success = await self.api.register_node(registration_data)
@@ -164,7 +231,9 @@ class NodeAgent:
         
         try:
             # Get current load and status
-            current_load = self.resource_monitor.get_current_load()
+            current_load = await asyncio.get_running_loop().run_in_executor(
+                None, self.resource_monitor.get_current_load
+            )
             active_jobs = self.job_manager.active_job_count()
             
             # Determine status based on load and jobs
@@ -175,9 +244,9 @@ class NodeAgent:
             
             # Prepare heartbeat data
             heartbeat_data = {
-                "message_id": str(uuid.uuid4()),
+                "message_id": new_message_id(),
                 "message_type": "node_heartbeat",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": utc_now_iso(),
                 "sender": {
                     "id": self.node_id,
                     "type": "node_agent"
@@ -196,7 +265,7 @@ class NodeAgent:
             
             # Send heartbeat to server
             success = await self.api.send_heartbeat(heartbeat_data)
-            self.last_heartbeat_time = time.time()
+            self.last_heartbeat_time = asyncio.get_running_loop().time()
             
             return success
                 
@@ -204,27 +273,38 @@ class NodeAgent:
             logger.error("Error sending heartbeat: %s", str(e))
             return False
     
-    async def request_jobs(self):
-        """Request new jobs from the server if capacity is available."""
+    async def request_jobs(self, snapshot: Optional[JobManagerSnapshot] = None):
+        """
+        Request new jobs from the server if capacity is available.
+        
+        Args:
+            snapshot (Optional[JobManagerSnapshot]): Job manager state for this
+                main loop iteration (capacity is read now if not given)
+        """
+        # How many jobs can we accept?
+        if snapshot is not None:
+            capacity = snapshot.available_capacity
+        else:
+            capacity = self.job_manager.get_available_capacity()
+        
         # Check if we have capacity for more jobs
-        if not self.job_manager.has_capacity():
+        if capacity <= 0:
             logger.debug("No capacity for new jobs, skipping job request")
             return
         
-        # Check resource constraints
+        # Check resource constraints (and look again on the next iteration)
         if not self.resource_monitor.can_accept_jobs():
             logger.debug("Resource constraints prevent accepting new jobs")
+            self._poll_jobs = True
             return
         
         # Check scheduling constraints
         if not self._can_process_jobs_now():
             logger.debug("Outside of scheduled processing hours, not requesting jobs")
+            self._poll_jobs = True
             return
         
         try:
-            # How many jobs can we accept?
-            capacity = self.job_manager.get_available_capacity()
-            
             # Request jobs from server
             jobs = await self.api.request_jobs(self.node_id, capacity)
             
@@ -247,61 +327,128 @@ class NodeAgent:
         except Exception as e:
             logger.error("Error requesting jobs: %s", str(e), exc_info=True)
     
-    async def process_job_results(self):
-        """Process completed job results and send them to the server."""
-        completed_jobs = self.job_manager.get_completed_jobs()
+    async def process_job_results(self, snapshot: Optional[JobManagerSnapshot] = None):
+        """
+        Process completed job results and send them to the server.
         
-        for job_id, result in completed_jobs.items():
-            try:
-                # Send result to server
-                success = await self.api.send_job_result(job_id, result)
-                
-                if success:
-                    logger.info("Successfully reported result for job %s", job_id)
-                    # Remove job from completed queue
-                    self.job_manager.remove_completed_job(job_id)
-                else:
-                    logger.warning("Failed to report result for job %s, will retry later", job_id)
-                    
-            except Exception as e:
-                logger.error("Error reporting job result for %s: %s", job_id, str(e), exc_info=True)
+        Args:
+            snapshot (Optional[JobManagerSnapshot]): Job manager state for this
+                main loop iteration, whose completed jobs this call now owns
+                (taken now if not given)
+        """
+        if snapshot is None:
+            snapshot = self.job_manager.snapshot()
+        completed_jobs = snapshot.completed_jobs
+        if not completed_jobs:
+            return
+        
+        # Send all results to the server at once rather than one round trip per job
+        sent = {}
+        try:
+            sent = await self.api.send_job_results(completed_jobs)
+        finally:
+            # Give results that weren't delivered back to the job manager
+            unsent = {
+                job_id: result for job_id, result in completed_jobs.items()
+                if not sent.get(job_id)
+            }
+            if unsent:
+                self.job_manager.restore_completed_jobs(unsent)
+        
+        for job_id, success in sent.items():
+            if success:
+                logger.info("Successfully reported result for job %s", job_id)
+            else:
+                logger.warning("Failed to report result for job %s, will retry later", job_id)
     
     async def main_loop(self):
         """Main agent operation loop."""
-        heartbeat_interval = self.config.node_agent.connection.heartbeat_interval_seconds
+        job_poll_interval = self._job_poll_interval
         
-        while self.is_running:
-            try:
-                # Ensure we're registered
-                if not self.is_registered:
-                    registered = await self.register_with_server()
-                    if not registered:
-                        # Wait before retrying
-                        await asyncio.sleep(30)
-                        continue
-                
-                # Send heartbeat if it's time
-                current_time = time.time()
-                if current_time - self.last_heartbeat_time >= heartbeat_interval:
-                    await self.send_heartbeat()
-                
-                # Request new jobs if we have capacity
-                await self.request_jobs()
-                
-                # Process any completed job results
-                await self.process_job_results()
-                
-                # Short sleep to avoid CPU spinning
-                await asyncio.sleep(1)
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._pushed_jobs = asyncio.Queue()
+        ws_was_connected = False
+        registration_attempt = 0
+        
+        try:
+            while self.is_running:
+                try:
+                    # Ensure we're registered
+                    if not self.is_registered:
+                        registered = await self.register_with_server()
+                        if not registered:
+                            # Wait before retrying; a wakeup (e.g. a job pushed by a
+                            # server that's back up, or stop) cuts the wait short
+                            delay = min(REGISTRATION_BACKOFF_MAX_SECONDS, 2 ** min(registration_attempt, 5))
+                            delay *= random.uniform(0.75, 1.25)
+                            registration_attempt += 1
+                            logger.info("Retrying registration in %.1f seconds", delay)
+                            await self._sleep_until_woken(delay)
+                            continue
+                        registration_attempt = 0
+                    
+                    # Heartbeats run on their own schedule once we're registered
+                    if self._heartbeat_task is None:
+                        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+                    
+                    # Take jobs the server pushed over the WebSocket
+                    await self._accept_pushed_jobs()
+                    
+                    # Only ask for jobs over HTTP when the push channel is down or has
+                    # just (re)connected, or a job slot freed up since the last request
+                    snapshot = self.job_manager.snapshot()
+                    tasks = [self.process_job_results(snapshot)]
+                    ws_connected = self.api.ws_connected
+                    if self._poll_jobs or not ws_connected or not ws_was_connected:
+                        self._poll_jobs = False
+                        tasks.append(self.request_jobs(snapshot))
+                    ws_was_connected = ws_connected
+                    
+                    # Independent network round trips overlap
+                    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+                    for outcome in outcomes:
+                        if isinstance(outcome, Exception):
+                            logger.error("Error in main loop: %s", str(outcome), exc_info=outcome)
+                    
+                    # Sleep until something happens (job finished, job pushed by the
+                    # server, stop requested) or the next job poll is due
+                    await self._sleep_until_woken(job_poll_interval)
                 
-            except Exception as e:
-                logger.error("Error in main loop: %s", str(e), exc_info=True)
-                await asyncio.sleep(5)  # Wait a bit before retrying
+                except Exception as e:
+                    logger.error("Error in main loop: %s", str(e), exc_info=True)
+                    await asyncio.sleep(5)  # Wait a bit before retrying
+    
+        finally:
+            if self._heartbeat_task is not None:
+                self._heartbeat_task.cancel()
+                await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+                self._heartbeat_task = None
+            
+            # Release HTTP/WebSocket connections before the event loop closes
+            await self.api.close()
+            await close_http_session()
+    
+    async def _heartbeat_loop(self):
+        """
+        Send heartbeats at the configured interval until the agent stops.
+        
+        A heartbeat is skipped when another request (job request, result,
+        acknowledged message) already reached the server within the interval.
+        """
+        while self.is_running:
+            since_contact = time.monotonic() - self.api.last_server_contact
+            if since_contact < self._heartbeat_interval:
+                await asyncio.sleep(self._heartbeat_interval - since_contact)
+                continue
+            
+            await self.send_heartbeat()
+            await asyncio.sleep(self._heartbeat_interval)
     
     def run(self):
         """Run the agent (blocking call)."""
         logger.info("Starting Node Agent with node ID: %s", self.node_id)
-        logger.info("Connecting to server: %s", self.config.node_agent.connection.server_url)
+        logger.info("Connecting to server: %s", self._server_url)
         
         self.is_running = True
         
@@ -329,25 +476,81 @@ class NodeAgent:
         """Stop the agent gracefully."""
         logger.info("Stopping Node Agent...")
         self.is_running = False
+        self._wake()
+    
+    async def _accept_pushed_jobs(self):
+        """Hand jobs pushed by the server over to the job manager."""
+        while not self._pushed_jobs.empty():
+            job = self._pushed_jobs.get_nowait()
+            try:
+                logger.info("Received pushed job assignment: %s", job.get("job_id", "unknown"))
+                await self.job_manager.add_job(job)
+            except Exception as e:
+                logger.error("Error handling job assignment: %s", str(e), exc_info=True)
+    
+    def _on_job_pushed(self, message: Dict):
+        """
+        Queue a job assignment pushed by the server and wake the main loop.
+        
+        Args:
+            message (Dict): job_assignment message, its payload is the job
+        """
+        if self._pushed_jobs is None:
+            return
+        
+        self._pushed_jobs.put_nowait(message.get("payload", {}))
+        self._wake()
+    
+    def _on_job_finished(self):
+        """Ask for more jobs now that a slot is free. Called from worker threads."""
+        self._poll_jobs = True
+        self._wake()
+    
+    async def _sleep_until_woken(self, timeout: float):
+        """
+        Sleep until the main loop is woken or the timeout expires.
+        
+        Args:
+            timeout (float): Longest time to sleep, in seconds
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+    
+    def _wake(self):
+        """Wake the main loop early. Safe to call from any thread."""
+        if self._loop is None or self._wakeup is None:
+            return
+        
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # Event loop already closed
+            pass
     
     def _get_available_hours(self) -> List[Dict]:
         """
         Get the hours during which this node is available to process jobs.
         
+        The scheduling config is fixed for the life of the agent, so this is
+        computed once in __init__ and kept in self._available_hours.
+        
         Returns:
             List[Dict]: List of available time windows
         """
         scheduling = self.config.node_agent.scheduling
         
         # If we're not restricted to working hours, we're always available
-        if not scheduling.get("working_hours_only", False):
+        if not self._working_hours_only:
             return [{"day_of_week": "All", "start_time": "00:00", "end_time": "23:59"}]
         
         # Otherwise, return configured working hours
         working_hours = []
         
-        start_time = scheduling.working_hours.get("start", "18:00")
-        end_time = scheduling.working_hours.get("end", "08:00")
+        start_time = scheduling.working_hours.start
+        end_time = scheduling.working_hours.end
         
         for day in scheduling.working_days:
             working_hours.append({
@@ -365,24 +568,20 @@ class NodeAgent:
         Returns:
             bool: True if jobs can be processed now, False otherwise
         """
-        scheduling = self.config.node_agent.scheduling
-        
         # If we're not restricted to working hours, we can always process jobs
-        if not scheduling.get("working_hours_only", False):
+        if not self._working_hours_only:
             return True
         
-        # Get current day and time
+        # Get current day and time (to the minute, like the configured hours)
         now = datetime.now()
-        day_name = now.strftime("%A")  # Monday, Tuesday, etc.
-        current_time = now.strftime("%H:%M")  # 24-hour format
         
         # Check if today is a working day
-        if day_name not in scheduling.working_days:
+        if DAY_NAMES[now.weekday()] not in self._working_days:
             return False
         
-        # Parse working hours
-        start_time = scheduling.working_hours.get("start", "18:00")
-        end_time = scheduling.working_hours.get("end", "08:00")
+        current_time = dt_time(now.hour, now.minute)
+        start_time = self._work_start
+        end_time = self._work_end
         
         # Handle overnight hours (end time less than start time)
         if end_time < start_time:
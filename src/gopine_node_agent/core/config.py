@@ -4,35 +4,27 @@ Configuration Management
 Handles loading and managing configuration for the node agent.
 """
 
+import copy
 import logging
 import os
 import platform
 import tempfile
-from typing import Dict, Any, Optional
+from datetime import datetime
+from typing import Dict, Any, List, Optional
 
 import yaml
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
 
 logger = logging.getLogger(__name__)
 
-class Config:
+class ConfigSection(BaseModel):
     """
-    Simple dot-notation access dictionary to handle configuration.
+    Base for configuration sections, with dot-notation and dict-like access.
+    
+    Unknown keys from the config file are kept as extra attributes.
     """
     
-    def __init__(self, config_dict: Dict[str, Any]):
-        """
-        Initialize a config object from a dictionary.
-        
-        Args:
-            config_dict (Dict[str, Any]): Configuration dictionary
-        """
-        for key, value in config_dict.items():
-            if isinstance(value, dict):
-                # Recursively convert nested dictionaries
-                setattr(self, key, Config(value))
-            else:
-                setattr(self, key, value)
+    model_config = ConfigDict(extra="allow")
     
     def __getitem__(self, key):
         """Allow dictionary-like access."""
@@ -44,13 +36,86 @@ class Config:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the config back to a dictionary."""
-        result = {}
-        for key, value in self.__dict__.items():
-            if isinstance(value, Config):
-                result[key] = value.to_dict()
-            else:
-                result[key] = value
-        return result
+        return self.model_dump()
+
+class ConnectionConfig(ConfigSection):
+    """Server connection settings."""
+    
+    server_url: str
+    websocket_url: str
+    reconnect_interval_seconds: int
+    heartbeat_interval_seconds: int
+    job_poll_interval_seconds: int
+    status_batch_delay_ms: int
+    max_reconnect_attempts: int
+
+class ResourcesConfig(ConfigSection):
+    """Local resource limits."""
+    
+    max_cpu_percent: float
+    max_memory_percent: float
+    min_free_disk_space_mb: int
+    concurrent_jobs: int
+
+class JobProcessingConfig(ConfigSection):
+    """Job execution settings."""
+    
+    work_dir: str
+    cleanup_after_job: bool
+    timeout_safety_margin_seconds: int
+    max_queue_size: int
+
+class WorkingHoursConfig(ConfigSection):
+    """Daily processing window, as 24-hour HH:MM times."""
+    
+    start: str
+    end: str
+    
+    @field_validator("start", "end")
+    @classmethod
+    def check_time_format(cls, value: str) -> str:
+        """Reject times that are not in HH:MM format."""
+        try:
+            datetime.strptime(value, "%H:%M")
+        except ValueError:
+            raise ValueError(f"Invalid time '{value}', expected HH:MM")
+        return value
+
+class SchedulingConfig(ConfigSection):
+    """When the node may process jobs."""
+    
+    working_hours_only: bool
+    working_hours: WorkingHoursConfig
+    working_days: List[str]
+
+class LoggingConfig(ConfigSection):
+    """Logging settings."""
+    
+    level: str
+    file: Optional[str] = None
+    max_size_mb: int
+    max_files: int
+
+class NodeAgentConfig(ConfigSection):
+    """Node agent configuration."""
+    
+    version: str
+    node_id: Optional[str] = None
+    connection: ConnectionConfig
+    resources: ResourcesConfig
+    job_processing: JobProcessingConfig
+    scheduling: SchedulingConfig
+    logging: LoggingConfig
+
+class Config(ConfigSection):
+    """
+    Root configuration object.
+    
+    Sections are typed models, so values are validated once at load time and
+    read as plain attributes afterwards.
+    """
+    
+    node_agent: NodeAgentConfig
 
 def get_default_config() -> Dict[str, Any]:
     """
@@ -73,6 +138,8 @@ def get_default_config() -> Dict[str, Any]:
                 "websocket_url": "ws://localhost:8081",
                 "reconnect_interval_seconds": 30,
                 "heartbeat_interval_seconds": 60,
+                "job_poll_interval_seconds": 10,
+                "status_batch_delay_ms": 50,
                 "max_reconnect_attempts": 10
             },
             "resources": {
@@ -84,7 +151,8 @@ def get_default_config() -> Dict[str, Any]:
             "job_processing": {
                 "work_dir": default_work_dir,
                 "cleanup_after_job": True,
-                "timeout_safety_margin_seconds": 60
+                "timeout_safety_margin_seconds": 60,
+                "max_queue_size": 1024
             },
             "scheduling": {
                 "working_hours_only": False,
@@ -142,20 +210,72 @@ def load_config(config_path: Optional[str] = None) -> Config:
             logger.info("No config file specified, using default configuration")
     
     # Create and return the Config object
-    return Config(config_dict)
+    try:
+        return Config.model_validate(config_dict)
+    except ValidationError as e:
+        logger.error("Invalid configuration: %s", str(e))
+        
+        # Only the invalid values fall back to their defaults, the rest of
+        # the user's configuration is kept
+        _reset_invalid_values(config_dict, get_default_config(), e.errors())
+        return Config.model_validate(config_dict)
+
+def _reset_invalid_values(config_dict: Dict[str, Any], default_config: Dict[str, Any],
+                          errors: List[Dict[str, Any]]):
+    """
+    Replace the configuration values that failed validation with their defaults.
+    
+    Args:
+        config_dict (Dict[str, Any]): Merged configuration (will be modified)
+        default_config (Dict[str, Any]): Default configuration
+        errors (List[Dict[str, Any]]): Validation errors, as from ValidationError.errors()
+    """
+    reset = set()
+    for error in errors:
+        # Longest prefix of the error location that has a default value; a
+        # bad list item or an unexpected nested key resets its whole field
+        path = []
+        default = default_config
+        for key in error["loc"]:
+            if not isinstance(default, dict) or key not in default:
+                break
+            path.append(key)
+            default = default[key]
+        
+        if tuple(path) in reset:
+            continue
+        reset.add(tuple(path))
+        
+        if not path:
+            config_dict.clear()
+            config_dict.update(copy.deepcopy(default_config))
+            continue
+        
+        target = config_dict
+        for key in path[:-1]:
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            target = target[key]
+        target[path[-1]] = copy.deepcopy(default)
+        
+        logger.warning("Using the default value for %s", ".".join(map(str, path)))
 
 def _merge_configs(base_config: Dict[str, Any], override_config: Dict[str, Any]):
     """
-    Recursively merge two configuration dictionaries.
+    Deep merge two configuration dictionaries.
     
     Args:
         base_config (Dict[str, Any]): Base configuration (will be modified)
         override_config (Dict[str, Any]): Configuration to override with
     """
-    for key, value in override_config.items():
-        if key in base_config and isinstance(base_config[key], dict) and isinstance(value, dict):
-            # Recursively merge nested dictionaries
-            _merge_configs(base_config[key], value)
-        else:
-            # Override or add the key-value pair
-            base_config[key] = value
\ No newline at end of file
+    # Walk nested dictionaries with an explicit stack instead of recursion
+    stack = [(base_config, override_config)]
+    while stack:
+        base, override = stack.pop()
+        for key, value in override.items():
+            if isinstance(value, dict) and isinstance(base.get(key), dict):
+                # Merge nested dictionaries
+                stack.append((base[key], value))
+            else:
+                # Override or add the key-value pair
+                base[key] = value
\ No newline at end of file
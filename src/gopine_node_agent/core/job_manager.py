@@ -5,24 +5,36 @@ Manages the execution of jobs on the node, including queuing, processing,
 and tracking results.
 """
 
-import asyncio
+import collections
 import json
 import logging
 import os
 import shutil
 import threading
-import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from queue import Queue
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 
 from gopine_node_agent.jobs.factory import JobFactory
 from gopine_node_agent.jobs.base_job import BaseJob
 
 logger = logging.getLogger(__name__)
 
+# How many job ids are remembered to ignore duplicate job submissions
+MAX_KNOWN_JOB_IDS = 100000
+
+@dataclass
+class JobManagerSnapshot:
+    """Job manager state read under a single lock acquisition."""
+    
+    __slots__ = ("active_jobs", "available_capacity", "completed_jobs")
+    
+    active_jobs: int
+    available_capacity: int
+    completed_jobs: Dict[str, Dict]
+
 class JobManager:
     """
     Manages job execution on the node.
@@ -39,7 +51,9 @@ class JobManager:
         self, 
         work_dir: str,
         concurrent_jobs: int = 2,
-        cleanup_after_job: bool = True
+        cleanup_after_job: bool = True,
+        max_queue_size: int = 1024,
+        on_job_finished: Optional[Callable[[], None]] = None
     ):
         """
         Initialize the job manager.
@@ -48,35 +62,52 @@ class JobManager:
             work_dir (str): Directory for job working files
             concurrent_jobs (int): Maximum number of jobs to run simultaneously
             cleanup_after_job (bool): Whether to clean up job files after completion
+            max_queue_size (int): Maximum number of jobs waiting for a free slot;
+                further jobs are rejected until the queue drains
+            on_job_finished (Optional[Callable[[], None]]): Called from the worker
+                thread whenever a job finishes and frees a slot
         """
         self.work_dir = work_dir
         self.concurrent_jobs = concurrent_jobs
         self.cleanup_after_job = cleanup_after_job
+        self.max_queue_size = max_queue_size
+        self.on_job_finished = on_job_finished
         
         # Create work directory if it doesn't exist
         os.makedirs(self.work_dir, exist_ok=True)
         
         # Job tracking
-        self.job_queue = Queue()
+        self.job_queue = collections.deque()  # Consumed by the job slot threads
         self.active_jobs = {}  # job_id -> Job object
         self.completed_jobs = {}  # job_id -> result dict
+        # Every job id accepted so far (oldest first, bounded), for duplicate checks
+        self.known_ids: collections.OrderedDict = collections.OrderedDict()
         
-        # Threading
-        self.executor = ThreadPoolExecutor(max_workers=self.concurrent_jobs)
+        # Threading: one persistent worker thread per job slot
         self.job_factory = JobFactory()
         self.is_running = False
-        self.worker_thread = None
-        self.lock = threading.RLock()
+        self.worker_threads: List[threading.Thread] = []
+        self.lock = threading.Lock()
+        # Signalled when a job is queued or the manager stops
+        self.cond = threading.Condition(self.lock)
+        
+        # Job directory cleanup runs in the background, off the job slot threads
+        self.io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jobfs")
     
     def start(self):
-        """Start the job manager worker thread."""
+        """Start the job manager worker threads."""
         if self.is_running:
             return
             
         logger.info("Starting job manager (max concurrent jobs: %d)", self.concurrent_jobs)
         self.is_running = True
-        self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-        self.worker_thread.start()
+        
+        self.worker_threads = [
+            threading.Thread(target=self._slot_loop, name=f"job-slot-{slot}", daemon=True)
+            for slot in range(self.concurrent_jobs)
+        ]
+        for thread in self.worker_threads:
+            thread.start()
     
     def stop(self):
         """Stop the job manager and clean up resources."""
@@ -86,11 +117,17 @@ class JobManager:
         logger.info("Stopping job manager...")
         self.is_running = False
         
-        if self.worker_thread:
-            self.worker_thread.join(timeout=5.0)
+        # Wake idle workers so they notice we're stopping, and wait for
+        # running jobs to finish
+        with self.cond:
+            self.cond.notify_all()
         
-        # Shutdown executor
-        self.executor.shutdown(wait=True)
+        for thread in self.worker_threads:
+            thread.join()
+        self.worker_threads = []
+        
+        # Let pending cleanups finish
+        self.io_executor.shutdown(wait=True)
         logger.info("Job manager stopped")
         
     async def add_job(self, job_data: Dict):
@@ -99,6 +136,9 @@ class JobManager:
         
         Args:
             job_data (Dict): Job data from the server
+            
+        Returns:
+            bool: True if the job was queued, False if it was ignored or rejected
         """
         job_id = job_data.get("job_id")
         if not job_id:
@@ -108,18 +148,31 @@ class JobManager:
         logger.info("Adding job %s to queue", job_id)
         
         with self.lock:
-            # Check if job is already in our system
-            if job_id in self.active_jobs or job_id in self.completed_jobs:
+            # Check if job has been in our system, including already reported jobs
+            if job_id in self.known_ids:
                 logger.warning("Job %s is already in the system, ignoring", job_id)
                 return False
             
-            # Add to queue
-            self.job_queue.put(job_data)
-            
-            # Notify server that we accepted the job
-            await self._notify_job_status(job_id, "queued")
-            
-            return True
+            # Don't let a burst of jobs pile up in memory
+            overloaded = len(self.job_queue) >= self.max_queue_size
+            if not overloaded:
+                self.known_ids[job_id] = None
+                if len(self.known_ids) > MAX_KNOWN_JOB_IDS:
+                    self.known_ids.popitem(last=False)
+                
+                # Add to queue
+                self.job_queue.append(job_data)
+                self.cond.notify()
+        
+        if overloaded:
+            logger.warning("Job queue is full (%d jobs), rejecting job %s", self.max_queue_size, job_id)
+            self._notify_job_status(job_id, "rejected_overloaded")
+            return False
+        
+        # Notify server that we accepted the job (outside the lock, it may do I/O)
+        self._notify_job_status(job_id, "queued")
+        
+        return True
         
     def has_capacity(self) -> bool:
         """
@@ -129,7 +182,7 @@ class JobManager:
             bool: True if we can accept more jobs, False otherwise
         """
         with self.lock:
-            return len(self.active_jobs) < self.concurrent_jobs
+            return not self.job_queue and len(self.active_jobs) < self.concurrent_jobs
     
     def get_available_capacity(self) -> int:
         """
@@ -139,7 +192,7 @@ class JobManager:
             int: Number of job slots available
         """
         with self.lock:
-            return max(0, self.concurrent_jobs - len(self.active_jobs))
+            return max(0, self.concurrent_jobs - len(self.active_jobs) - len(self.job_queue))
     
     def active_job_count(self) -> int:
         """
@@ -151,16 +204,60 @@ class JobManager:
         with self.lock:
             return len(self.active_jobs)
     
+    def queue_depth(self) -> int:
+        """
+        Get the number of jobs waiting for a free slot.
+        
+        Returns:
+            int: Number of queued jobs
+        """
+        with self.lock:
+            return len(self.job_queue)
+    
     def get_completed_jobs(self) -> Dict[str, Dict]:
         """
-        Get all completed jobs that haven't been reported to the server.
+        Take all completed jobs that haven't been reported to the server.
+        
+        The results are handed over rather than copied: the caller owns them
+        and must give back any it fails to report with restore_completed_jobs.
         
         Returns:
             Dict[str, Dict]: Dictionary mapping job_id to job result
         """
         with self.lock:
-            # Return a copy to avoid modification during iteration
-            return dict(self.completed_jobs)
+            completed, self.completed_jobs = self.completed_jobs, {}
+        return completed
+    
+    def snapshot(self) -> JobManagerSnapshot:
+        """
+        Get the active job count, free capacity and unreported results at once.
+        
+        Unreported results are handed over as by get_completed_jobs.
+        
+        Returns:
+            JobManagerSnapshot: Consistent view of the job manager state
+        """
+        with self.lock:
+            active = len(self.active_jobs)
+            available_capacity = max(0, self.concurrent_jobs - active - len(self.job_queue))
+            completed, self.completed_jobs = self.completed_jobs, {}
+        
+        return JobManagerSnapshot(
+            active_jobs=active,
+            available_capacity=available_capacity,
+            completed_jobs=completed
+        )
+    
+    def restore_completed_jobs(self, results: Dict[str, Dict]):
+        """
+        Give back completed job results that could not be reported, to retry later.
+        
+        Args:
+            results (Dict[str, Dict]): Dictionary mapping job_id to job result
+        """
+        with self.lock:
+            for job_id, result in results.items():
+                self.completed_jobs.setdefault(job_id, result)
     
     def remove_completed_job(self, job_id: str):
         """
@@ -170,73 +267,72 @@ class JobManager:
             job_id (str): ID of the job to remove
         """
         with self.lock:
-            if job_id in self.completed_jobs:
-                del self.completed_jobs[job_id]
-                logger.debug("Removed job %s from completed jobs", job_id)
+            removed = self.completed_jobs.pop(job_id, None)
+        
+        if removed is not None:
+            logger.debug("Removed job %s from completed jobs", job_id)
     
-    def _worker_loop(self):
-        """Main worker loop that processes jobs from the queue."""
-        logger.info("Job manager worker thread started")
+    def _slot_loop(self):
+        """Worker thread loop: take jobs from the queue and run them, one at a time."""
+        logger.debug("Job slot thread %s started", threading.current_thread().name)
         
-        while self.is_running:
-            try:
-                # Check if we have capacity for another job
-                if not self.has_capacity():
-                    time.sleep(1)
-                    continue
-                
-                # Try to get a job from the queue (non-blocking)
-                try:
-                    job_data = self.job_queue.get(block=False)
-                except Exception:
-                    # No jobs in queue
-                    time.sleep(1)
-                    continue
-                
-                # Process the job
-                job_id = job_data.get("job_id")
-                if not job_id:
-                    logger.error("Job data missing job_id, skipping")
-                    self.job_queue.task_done()
-                    continue
+        while True:
+            # Wait until there's a queued job
+            with self.cond:
+                while self.is_running and not self.job_queue:
+                    self.cond.wait(timeout=5.0)
                 
-                # Create a job directory
-                job_dir = os.path.join(self.work_dir, job_id)
-                os.makedirs(job_dir, exist_ok=True)
-                
-                try:
-                    # Create the appropriate job instance
-                    job_type = job_data.get("job_type")
-                    if not job_type:
-                        raise ValueError("Job data missing job_type")
-                    
-                    job = self.job_factory.create_job(
-                        job_type=job_type,
-                        job_id=job_id,
-                        job_data=job_data,
-                        work_dir=job_dir
-                    )
-                    
-                    # Track this job
-                    with self.lock:
-                        self.active_jobs[job_id] = job
-                    
-                    # Start the job in the thread pool
-                    self.executor.submit(self._execute_job, job)
-                    
-                except Exception as e:
-                    logger.error("Error preparing job %s: %s", job_id, str(e), exc_info=True)
-                    # Report failure
-                    loop = asyncio.new_event_loop()
-                    loop.run_until_complete(self._notify_job_failure(job_id, str(e)))
-                    loop.close()
-                    
-                    # Mark as done in queue
-                    self.job_queue.task_done()
+                if not self.is_running:
+                    break
                 
+                job_data = self.job_queue.popleft()
+            
+            try:
+                job = self._prepare_job(job_data)
+                if job is not None:
+                    self._execute_job(job)
             except Exception as e:
-                logger.error("Error in job manager worker loop: %s", str(e), exc_info=True)
-                time.sleep(1)
+                logger.error("Error in job slot loop: %s", str(e), exc_info=True)
+    
+    def _prepare_job(self, job_data: Dict) -> Optional[BaseJob]:
+        """
+        Create the job instance for queued job data and mark it active.
+        
+        Args:
+            job_data (Dict): Job data from the server
+            
+        Returns:
+            Optional[BaseJob]: The job, or None if it could not be created
+        """
+        job_id = job_data.get("job_id")
+        if not job_id:
+            logger.error("Job data missing job_id, skipping")
+            return None
+        
+        try:
+            # Create the appropriate job instance
+            job_type = job_data.get("job_type")
+            if not job_type:
+                raise ValueError("Job data missing job_type")
+            
+            job = self.job_factory.create_job(
+                job_type=job_type,
+                job_id=job_id,
+                job_data=job_data,
+                work_dir=os.path.join(self.work_dir, job_id)
+            )
+            
+            # Track this job
+            with self.lock:
+                self.active_jobs[job_id] = job
+            
+            return job
+            
+        except Exception as e:
+            logger.error("Error preparing job %s: %s", job_id, str(e), exc_info=True)
+            # Report failure
+            self._notify_job_failure(job_id, str(e))
+            return None
     
     def _execute_job(self, job: BaseJob):
         """
@@ -248,13 +344,9 @@ class JobManager:
         job_id = job.job_id
         logger.info("Starting execution of job %s", job_id)
         
-        # Set up event loop for async operations
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         try:
             # Notify job start
-            loop.run_until_complete(self._notify_job_status(job_id, "processing"))
+            self._notify_job_status(job_id, "processing")
             
             # Execute the job
             result = job.execute()
@@ -263,11 +355,10 @@ class JobManager:
             with self.lock:
                 self.completed_jobs[job_id] = result
                 # Remove from active jobs
-                if job_id in self.active_jobs:
-                    del self.active_jobs[job_id]
+                self.active_jobs.pop(job_id, None)
             
             # Notify job completion
-            loop.run_until_complete(self._notify_job_status(job_id, "completed"))
+            self._notify_job_status(job_id, "completed")
             
             logger.info("Job %s completed successfully", job_id)
             
@@ -276,39 +367,84 @@ class JobManager:
             
             # Remove from active jobs
             with self.lock:
-                if job_id in self.active_jobs:
-                    del self.active_jobs[job_id]
+                self.active_jobs.pop(job_id, None)
             
             # Notify job failure
-            loop.run_until_complete(self._notify_job_failure(job_id, str(e)))
+            self._notify_job_failure(job_id, str(e))
             
         finally:
             # Clean up
             if self.cleanup_after_job:
-                self._cleanup_job_files(job_id)
-            
-            # Mark as done in queue
-            self.job_queue.task_done()
+                # The job created its directory and keeps its path (see BaseJob)
+                self.io_executor.submit(self._cleanup_job_files, job.work_dir)
             
-            # Close event loop
-            loop.close()
+            # Let the agent report the result and fetch more work
+            if self.on_job_finished:
+                self.on_job_finished()
     
-    def _cleanup_job_files(self, job_id: str):
+    def _cleanup_job_files(self, job_dir: str):
         """
         Clean up temporary files created for a job.
         
         Args:
-            job_id (str): ID of the job to clean up
+            job_dir (str): Working directory of the job to clean up
         """
-        job_dir = os.path.join(self.work_dir, job_id)
-        if os.path.exists(job_dir):
+        try:
+            entries = list(os.scandir(job_dir))
+        except FileNotFoundError:
+            # The job failed before creating its directory
+            return
+        except OSError as e:
+            logger.warning("Error cleaning up job directory %s: %s", job_dir, str(e))
+            return
+        
+        if not entries:
+            self._remove_job_dir(job_dir)
+            return
+        
+        # Remove the top-level entries (typically input/ and output/) in
+        # parallel on the I/O threads. This task doesn't wait for them, which
+        # could deadlock the pool; whichever removal finishes last removes
+        # the job directory itself.
+        remaining = [len(entries)]
+        remaining_lock = threading.Lock()
+        
+        def remove_entry(entry: os.DirEntry):
             try:
-                shutil.rmtree(job_dir)
-                logger.debug("Cleaned up job directory for %s", job_id)
-            except Exception as e:
-                logger.warning("Error cleaning up job directory for %s: %s", job_id, str(e))
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.unlink(entry.path)
+            except OSError as e:
+                logger.debug("Error removing %s: %s", entry.path, str(e))
+            
+            with remaining_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._remove_job_dir(job_dir)
+        
+        for entry in entries:
+            try:
+                self.io_executor.submit(remove_entry, entry)
+            except RuntimeError:
+                # The executor is shutting down; finish the cleanup here
+                remove_entry(entry)
+    
+    def _remove_job_dir(self, job_dir: str):
+        """
+        Remove a job directory whose contents have been deleted.
+        
+        Args:
+            job_dir (str): Working directory of the job
+        """
+        try:
+            os.rmdir(job_dir)
+            logger.debug("Cleaned up job directory %s", job_dir)
+        except OSError as e:
+            logger.warning("Error cleaning up job directory %s: %s", job_dir, str(e))
     
-    async def _notify_job_status(self, job_id: str, status: str):
+    def _notify_job_status(self, job_id: str, status: str):
         """
         Notify the server about a job status change.
         
@@ -321,9 +457,11 @@ class JobManager:
         logger.info("Job %s status changed to: %s", job_id, status)
         
         # In a real implementation, we would send a message to the server
-        # Something like: await self.server_api.update_job_status(job_id, status)
+        # Something like: asyncio.run_coroutine_threadsafe(
+        #     self.server_api.update_job_status(job_id, status), agent_loop)
+        # with agent_loop being the agent's running event loop
     
-    async def _notify_job_failure(self, job_id: str, error_message: str):
+    def _notify_job_failure(self, job_id: str, error_message: str):
         """
         Notify the server about a job failure.
         
@@ -336,4 +474,6 @@ class JobManager:
         logger.info("Job %s failed: %s", job_id, error_message)
         
         # In a real implementation, we would send a message to the server
-        # Something like: await self.server_api.notify_job_failure(job_id, error_message)
\ No newline at end of file
+        # Something like: asyncio.run_coroutine_threadsafe(
+        #     self.server_api.notify_job_failure(job_id, error_message), agent_loop)
+        # with agent_loop being the agent's running event loop
\ No newline at end of file
@@ -1,7 +1,8 @@
 """
 Logging Configuration
 
-Sets up logging for the node agent with colorized console output and file logging.
+Sets up logging for the node agent with console output (colorized on a
+terminal) and file logging.
 """
 
 import logging
@@ -10,7 +11,28 @@ import os
 import sys
 from typing import Optional
 
-import colorlog
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+class FastTimeMixin:
+    """
+    Formats record times as LOG_DATE_FORMAT without calling strftime per record.
+    
+    The formatted time is reused for all records logged within the same second.
+    """
+    
+    _cached_time = (None, "")  # (whole second, formatted time)
+    
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, formatted = self._cached_time
+        if second != cached_second:
+            formatted = "%04d-%02d-%02d %02d:%02d:%02d" % self.converter(second)[:6]
+            self._cached_time = (second, formatted)
+        return formatted
+
+class FastFormatter(FastTimeMixin, logging.Formatter):
+    """Plain formatter using the cached time formatting of FastTimeMixin."""
 
 def setup_logging(
     level: int = logging.INFO,
@@ -27,6 +49,11 @@ def setup_logging(
         max_size_mb (int): Maximum log file size in MB before rotation
         backup_count (int): Number of backup log files to keep
     """
+    # The log format doesn't use thread or process names, don't collect them
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
     # Create root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
@@ -35,25 +62,34 @@ def setup_logging(
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
     
-    # Create console handler with colorized output
+    # Create console handler, colorized only when writing to a terminal
     console_handler = logging.StreamHandler(stream=sys.stdout)
     console_handler.setLevel(level)
     
-    # Define color scheme
-    colors = {
-        'DEBUG': 'cyan',
-        'INFO': 'green',
-        'WARNING': 'yellow',
-        'ERROR': 'red',
-        'CRITICAL': 'bold_red',
-    }
-    
-    # Create formatter
-    console_formatter = colorlog.ColoredFormatter(
-        '%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S',
-        log_colors=colors
-    )
+    use_color = sys.stdout.isatty() and os.environ.get("NO_COLOR") is None
+    if use_color:
+        import colorlog
+        
+        # Define color scheme
+        colors = {
+            'DEBUG': 'cyan',
+            'INFO': 'green',
+            'WARNING': 'yellow',
+            'ERROR': 'red',
+            'CRITICAL': 'bold_red',
+        }
+        
+        class FastColoredFormatter(FastTimeMixin, colorlog.ColoredFormatter):
+            pass
+        
+        console_formatter = FastColoredFormatter(
+            '%(log_color)s' + LOG_FORMAT,
+            datefmt=LOG_DATE_FORMAT,
+            log_colors=colors
+        )
+    else:
+        # Redirected to a file, pipe or journal: no ANSI codes
+        console_formatter = FastFormatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
     
     console_handler.setFormatter(console_formatter)
     root_logger.addHandler(console_handler)
@@ -76,18 +112,18 @@ def setup_logging(
             
             file_handler.setLevel(level)
             
-            # Create formatter (without colors for file)
-            file_formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
+            # Without colors, the console formatter is reused for the file
+            if use_color:
+                file_formatter = FastFormatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+            else:
+                file_formatter = console_formatter
             
             file_handler.setFormatter(file_formatter)
             root_logger.addHandler(file_handler)
             
-            logging.info(f"Logging to file: {log_file}")
+            logging.info("Logging to file: %s", log_file)
         except Exception as e:
-            logging.error(f"Failed to set up file logging: {str(e)}")
+            logging.error("Failed to set up file logging: %s", str(e))
     
     # Set level for some verbose libraries
     logging.getLogger("urllib3").setLevel(logging.WARNING)
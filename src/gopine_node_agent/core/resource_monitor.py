@@ -5,15 +5,20 @@ Monitors system resources (CPU, memory, disk) to ensure the node agent
 only accepts jobs when sufficient resources are available.
 """
 
+import collections
 import logging
+import os
 import threading
 import time
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 import psutil
 
 logger = logging.getLogger(__name__)
 
+# How long a psutil memory/disk reading is reused before querying again
+PSUTIL_CACHE_TTL_SECONDS = 1.0
+
 class ResourceMonitor:
     """
     Monitors system resources to control job acceptance.
@@ -32,7 +37,8 @@ class ResourceMonitor:
         max_cpu_percent: float = 80.0,
         max_memory_percent: float = 70.0,
         min_free_disk_space_mb: int = 1000,
-        check_interval_seconds: int = 5
+        check_interval_seconds: int = 5,
+        disk_path: Optional[str] = None
     ):
         """
         Initialize the resource monitor.
@@ -42,25 +48,41 @@ class ResourceMonitor:
             max_memory_percent (float): Maximum memory usage percentage to accept jobs
             min_free_disk_space_mb (int): Minimum free disk space in MB to accept jobs
             check_interval_seconds (int): How often to check resource usage
+            disk_path (Optional[str]): Path whose disk is checked for free space
+                (defaults to the root of the current drive; on Windows the root
+                of the path's drive is checked)
         """
         self.max_cpu_percent = max_cpu_percent
         self.max_memory_percent = max_memory_percent
         self.min_free_disk_space_mb = min_free_disk_space_mb
         self.check_interval_seconds = check_interval_seconds
         
+        # Resolve the checked path once rather than on every check
+        disk_path = os.path.abspath(disk_path or os.sep)
+        drive, _ = os.path.splitdrive(disk_path)
+        self.disk_path = drive + os.sep if drive else disk_path
+        
         # Current resource usage
         self.current_cpu_percent = 0.0
+        self.current_per_core_cpu_percent = []
         self.current_memory_percent = 0.0
         self.current_free_disk_space_mb = 0
+        self.current_available_memory_mb = 0
         
         # Averages (over the last minute)
         self.avg_cpu_percent = 0.0
         self.avg_memory_percent = 0.0
         
-        # CPU usage history (for averaging)
-        self.cpu_history = []
-        self.memory_history = []
+        # CPU usage history (for averaging), with running sums of the windows
         self.history_size = 12  # Last minute (12 * 5 seconds)
+        self.cpu_history = collections.deque(maxlen=self.history_size)
+        self.memory_history = collections.deque(maxlen=self.history_size)
+        self.cpu_sum = 0.0
+        self.memory_sum = 0.0
+        
+        # Cached psutil readings as (value, expiry monotonic time)
+        self._memory_cache = None
+        self._disk_cache = {}  # path -> (usage, expiry)
         
         # Threading
         self.is_running = False
@@ -76,6 +98,11 @@ class ResourceMonitor:
                   self.max_cpu_percent, self.max_memory_percent)
         
         self.is_running = True
+        
+        # Prime the CPU counter: non-blocking cpu_percent() reports usage since
+        # the previous call
+        psutil.cpu_percent(interval=None, percpu=True)
+        
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
     
@@ -92,23 +119,63 @@ class ResourceMonitor:
         
         logger.info("Resource monitor stopped")
     
-    def get_current_load(self) -> Dict[str, float]:
+    def get_current_load(self) -> Dict[str, Any]:
         """
         Get the current system load.
         
         Returns:
-            Dict[str, float]: Dictionary with current resource usage metrics
+            Dict[str, Any]: Dictionary with current resource usage metrics
+                (per_core_cpu_percent is a list with one value per logical CPU)
         """
         with self.lock:
             return {
                 "cpu_percent": self.current_cpu_percent,
+                "per_core_cpu_percent": self.current_per_core_cpu_percent,
                 "memory_percent": self.current_memory_percent,
                 "free_disk_space_mb": self.current_free_disk_space_mb,
-                "available_memory_mb": psutil.virtual_memory().available // (1024 * 1024),
+                "available_memory_mb": self.current_available_memory_mb,
                 "avg_cpu_percent": self.avg_cpu_percent,
                 "avg_memory_percent": self.avg_memory_percent
             }
     
+    def get_virtual_memory(self):
+        """
+        Get system memory usage, reusing a reading taken within the cache TTL.
+        
+        Returns:
+            psutil.virtual_memory() result
+        """
+        now = time.monotonic()
+        with self.lock:
+            if self._memory_cache is not None and now < self._memory_cache[1]:
+                return self._memory_cache[0]
+        
+        memory = psutil.virtual_memory()
+        with self.lock:
+            self._memory_cache = (memory, now + PSUTIL_CACHE_TTL_SECONDS)
+        return memory
+    
+    def get_disk_usage(self, path: str):
+        """
+        Get disk usage for a path, reusing a reading taken within the cache TTL.
+        
+        Args:
+            path (str): Path on the disk to check
+            
+        Returns:
+            psutil.disk_usage() result
+        """
+        now = time.monotonic()
+        with self.lock:
+            cached = self._disk_cache.get(path)
+            if cached is not None and now < cached[1]:
+                return cached[0]
+        
+        usage = psutil.disk_usage(path)
+        with self.lock:
+            self._disk_cache[path] = (usage, now + PSUTIL_CACHE_TTL_SECONDS)
+        return usage
+    
     def can_accept_jobs(self) -> bool:
         """
         Check if the system has enough resources to accept new jobs.
@@ -139,36 +206,41 @@ class ResourceMonitor:
         
         while self.is_running:
             try:
-                # Get CPU usage (as a percentage of all cores)
-                cpu_percent = psutil.cpu_percent(interval=0.1)
+                # Get CPU usage per core since the last check; the overall usage
+                # is their average, so one reading gives both
+                per_core_cpu_percent = psutil.cpu_percent(interval=None, percpu=True)
+                cpu_percent = sum(per_core_cpu_percent) / (len(per_core_cpu_percent) or 1)
                 
                 # Get memory usage
-                memory = psutil.virtual_memory()
+                memory = self.get_virtual_memory()
                 memory_percent = memory.percent
                 
-                # Get disk usage for the system drive
-                disk = psutil.disk_usage("/")
-                free_disk_space_mb = disk.free // (1024 * 1024)
+                # Get disk usage for the drive we work on
+                disk = self.get_disk_usage(self.disk_path)
+                free_disk_space_mb = disk.free >> 20
                 
                 # Update current values
                 with self.lock:
                     self.current_cpu_percent = cpu_percent
+                    self.current_per_core_cpu_percent = per_core_cpu_percent
                     self.current_memory_percent = memory_percent
                     self.current_free_disk_space_mb = free_disk_space_mb
+                    self.current_available_memory_mb = memory.available >> 20
                     
-                    # Update history
+                    # Update history; a full deque drops its oldest sample on append,
+                    # so take that sample out of the running sum first
+                    if len(self.cpu_history) == self.history_size:
+                        self.cpu_sum -= self.cpu_history[0]
+                    if len(self.memory_history) == self.history_size:
+                        self.memory_sum -= self.memory_history[0]
                     self.cpu_history.append(cpu_percent)
                     self.memory_history.append(memory_percent)
-                    
-                    # Keep history to the desired size
-                    if len(self.cpu_history) > self.history_size:
-                        self.cpu_history.pop(0)
-                    if len(self.memory_history) > self.history_size:
-                        self.memory_history.pop(0)
+                    self.cpu_sum += cpu_percent
+                    self.memory_sum += memory_percent
                     
                     # Calculate averages
-                    self.avg_cpu_percent = sum(self.cpu_history) / len(self.cpu_history)
-                    self.avg_memory_percent = sum(self.memory_history) / len(self.memory_history)
+                    self.avg_cpu_percent = self.cpu_sum / len(self.cpu_history)
+                    self.avg_memory_percent = self.memory_sum / len(self.memory_history)
                 
                 # Log if system is under heavy load
                 if self.avg_cpu_percent > self.max_cpu_percent:
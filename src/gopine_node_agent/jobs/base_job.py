@@ -8,11 +8,29 @@ import abc
 import logging
 import os
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+def _build_stats(start_time: datetime, end_time: datetime, processing_time: float) -> Dict[str, Any]:
+    """
+    Build the processing_stats section of a job result.
+    
+    Args:
+        start_time (datetime): When the job started
+        end_time (datetime): When the job finished
+        processing_time (float): Job duration in seconds
+        
+    Returns:
+        Dict[str, Any]: Processing time and ISO-formatted start/end times
+    """
+    return {
+        "processing_time_seconds": processing_time,
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat()
+    }
+
 class BaseJob(abc.ABC):
     """
     Base class for all job types.
@@ -21,6 +39,12 @@ class BaseJob(abc.ABC):
     and provides common functionality.
     """
     
+    __slots__ = (
+        "job_id", "job_data", "work_dir", "job_type", "priority", "timeout_seconds",
+        "parameters", "start_time", "start_monotonic", "end_time", "progress", "status",
+        "error", "input_dir", "output_dir", "_last_logged_progress"
+    )
+    
     def __init__(self, job_id: str, job_data: Dict[str, Any], work_dir: str):
         """
         Initialize a job.
@@ -34,9 +58,6 @@ class BaseJob(abc.ABC):
         self.job_data = job_data
         self.work_dir = work_dir
         
-        # Create work directory if it doesn't exist
-        os.makedirs(self.work_dir, exist_ok=True)
-        
         # Basic job information
         self.job_type = job_data.get("job_type")
         self.priority = job_data.get("priority", 5)
@@ -45,16 +66,19 @@ class BaseJob(abc.ABC):
         
         # Status tracking
         self.start_time = None
+        self.start_monotonic = None  # time.monotonic() at start, for durations
         self.end_time = None
         self.progress = 0.0
+        self._last_logged_progress = -1.0
         self.status = "assigned"
         self.error = None
         
-        # Create input and output directories
+        # Create input and output directories (creating output_dir also creates
+        # the work directory if it doesn't exist)
         self.input_dir = os.path.join(self.work_dir, "input")
         self.output_dir = os.path.join(self.work_dir, "output")
-        os.makedirs(self.input_dir, exist_ok=True)
         os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.input_dir, exist_ok=True)
     
     def execute(self) -> Dict[str, Any]:
         """
@@ -65,6 +89,7 @@ class BaseJob(abc.ABC):
         """
         logger.info("Starting job %s of type %s", self.job_id, self.job_type)
         self.start_time = datetime.now()
+        self.start_monotonic = time.monotonic()
         self.status = "processing"
         
         try:
@@ -82,18 +107,15 @@ class BaseJob(abc.ABC):
             self.progress = 100.0
             
             # Update timing
-            self.end_time = datetime.now()
-            processing_time = (self.end_time - self.start_time).total_seconds()
+            processing_time = self.elapsed_seconds()
+            self.end_time = self.start_time + timedelta(seconds=processing_time)
+            processing_stats = _build_stats(self.start_time, self.end_time, processing_time)
             
             # Prepare result data
             result_data = {
                 "status": "completed",
                 "result": result,
-                "processing_stats": {
-                    "processing_time_seconds": processing_time,
-                    "start_time": self.start_time.isoformat(),
-                    "end_time": self.end_time.isoformat()
-                }
+                "processing_stats": processing_stats
             }
             
             logger.info("Job %s completed successfully in %.1f seconds", 
@@ -109,21 +131,17 @@ class BaseJob(abc.ABC):
             self.error = str(e)
             
             # Update timing
-            self.end_time = datetime.now()
-            processing_time = (self.end_time - self.start_time).total_seconds()
+            processing_time = self.elapsed_seconds()
+            self.end_time = self.start_time + timedelta(seconds=processing_time)
             
             # Prepare error data
             error_data = {
                 "status": "failed",
                 "error": {
-                    "message": str(e),
+                    "message": self.error,
                     "details": self._get_error_details()
                 },
-                "processing_stats": {
-                    "processing_time_seconds": processing_time,
-                    "start_time": self.start_time.isoformat(),
-                    "end_time": self.end_time.isoformat()
-                }
+                "processing_stats": _build_stats(self.start_time, self.end_time, processing_time)
             }
             
             return error_data
@@ -180,9 +198,18 @@ class BaseJob(abc.ABC):
             "job_id": self.job_id,
             "job_type": self.job_type,
             "parameters": self.parameters,
-            "error_time": datetime.now().isoformat()
+            "error_time": (self.end_time or datetime.now()).isoformat()
         }
     
+    def elapsed_seconds(self) -> float:
+        """
+        Get the time since the job started, from the monotonic clock.
+        
+        Returns:
+            float: Seconds since the job started
+        """
+        return time.monotonic() - self.start_monotonic
+    
     def update_progress(self, progress: float):
         """
         Update the job progress.
@@ -191,4 +218,9 @@ class BaseJob(abc.ABC):
             progress (float): Progress percentage (0-100)
         """
         self.progress = max(0.0, min(100.0, progress))
-        logger.debug("Job %s progress: %.1f%%", self.job_id, self.progress)
\ No newline at end of file
+        
+        # Log at most once per percentage point; fine-grained reporters call this a lot
+        if (abs(self.progress - self._last_logged_progress) >= 1.0
+                and logger.isEnabledFor(logging.DEBUG)):
+            self._last_logged_progress = self.progress
+            logger.debug("Job %s progress: %.1f%%", self.job_id, self.progress)
\ No newline at end of file
@@ -4,9 +4,8 @@ Job Factory
 Factory for creating job instances based on job type.
 """
 
-import importlib
 import logging
-from typing import Dict, Any, Optional, Type
+from typing import Dict, Any, Type
 
 from gopine_node_agent.jobs.base_job import BaseJob
 from gopine_node_agent.jobs.ocr_job import OCRJob
@@ -19,13 +18,16 @@ class JobFactory:
     Factory for creating job instances based on job type.
     """
     
+    # Map of built-in job types to job classes
+    _JOB_CLASSES: Dict[str, Type[BaseJob]] = {
+        "ocr": OCRJob,
+        "pdf_parse": PDFParseJob
+    }
+    
     def __init__(self):
         """Initialize the job factory."""
-        # Map of job types to job classes
-        self.job_classes = {
-            "ocr": OCRJob,
-            "pdf_parse": PDFParseJob
-        }
+        # Shared with the class until a job class is registered on this factory
+        self.job_classes = self._JOB_CLASSES
     
     def create_job(
         self,
@@ -50,9 +52,9 @@ class JobFactory:
             ValueError: If job type is unknown
         """
         # Get the job class for this job type
-        job_class = self.job_classes.get(job_type)
-        
-        if not job_class:
+        try:
+            job_class = self.job_classes[job_type]
+        except KeyError:
             raise ValueError(f"Unknown job type: {job_type}")
         
         # Create and return the job instance
@@ -66,6 +68,9 @@ class JobFactory:
             job_type (str): Job type identifier
             job_class (Type[BaseJob]): Job class
         """
+        if self.job_classes is self._JOB_CLASSES:
+            # Don't register the job class on other factories too
+            self.job_classes = dict(self._JOB_CLASSES)
         self.job_classes[job_type] = job_class
         logger.info("Registered job class for type: %s", job_type)
     
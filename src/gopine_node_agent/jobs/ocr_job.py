@@ -6,19 +6,39 @@ Implementation of OCR (Optical Character Recognition) job for the GoPine system.
 
 import logging
 import os
-import shutil
 import subprocess
-import time
-from typing import Dict, Any, List, Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 
-import pytesseract
+import numpy as np
+import orjson
 from PIL import Image
 
 from gopine_node_agent.jobs.base_job import BaseJob
-from gopine_node_agent.utils.image_processing import preprocess_image
+from gopine_node_agent.utils.image_processing import (
+    estimate_skew_angle,
+    is_blank_page,
+    load_image,
+    preprocess_image
+)
 
 logger = logging.getLogger(__name__)
 
+# tesserocr keeps tesseract and its language models loaded between pages;
+# without it each page runs the tesseract binary through pytesseract
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# PyMuPDF renders PDF pages in memory; without it pages are extracted to
+# image files with poppler's pdftoppm
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
 class OCRJob(BaseJob):
     """
     OCR job implementation.
@@ -37,9 +57,8 @@ class OCRJob(BaseJob):
         """
         super().__init__(job_id, job_data, work_dir)
         
-        # OCR-specific directories
+        # OCR-specific directories (created when pages are extracted to files)
         self.pages_dir = os.path.join(self.work_dir, "pages")
-        os.makedirs(self.pages_dir, exist_ok=True)
         
         # Extract OCR-specific parameters
         self.language = self.parameters.get("language", "eng")
@@ -53,18 +72,41 @@ class OCRJob(BaseJob):
         self.denoise = self.preprocessing.get("denoise", False)
         self.deskew = self.preprocessing.get("deskew", True)
         self.contrast_enhance = self.preprocessing.get("contrast_enhance", False)
+        self.skip_blank_pages = self.preprocessing.get("skip_blank_pages", True)
+        self._needs_preprocessing = (
+            self.grayscale or self.denoise or self.deskew or self.contrast_enhance
+        )
+        # Skew measured on the first page; scanners usually skew all pages alike
+        self._skew_angle = None
         
         # Advanced options
         self.advanced_options = self.parameters.get("advanced_options", {})
         self.engine = self.advanced_options.get("engine", "tesseract")
         self.psm = self.advanced_options.get("psm", 3)  # Page segmentation mode
         self.oem = self.advanced_options.get("oem", 3)  # OCR Engine mode
+        # tesseract options, the same for every page
+        self._tesseract_config = f"--psm {self.psm} --oem {self.oem}"
+        # Number of pages OCR'd in parallel
+        self.max_workers = self.advanced_options.get("workers") or os.cpu_count() or 1
+        
+        # Checked once per job rather than for every page's debug messages
+        self._debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
+        # tesserocr API instances: one per OCR worker thread, closed when the job ends
+        self._tesserocr_local = threading.local()
+        self._tesserocr_apis = []
         
         # Results tracking
         self.pages_processed = 0
         self.characters_recognized = 0
         self.overall_confidence = 0.0
         self.page_details = []
+        # Per-page results, indexed by page number - 1 and filled in by the OCR
+        # workers; page_details is built from them once all pages are done
+        self._page_confidence = np.zeros(0, dtype=np.float64)
+        self._page_word_count = np.zeros(0, dtype=np.int32)
+        self._page_blank = np.zeros(0, dtype=bool)
+        self._page_errors = {}  # page index -> error message
     
     def _validate_parameters(self):
         """
@@ -103,118 +145,322 @@ class OCRJob(BaseJob):
         # Check file extension to determine processing approach
         ext = os.path.splitext(input_file.lower())[1]
         
-        # For PDF files, extract pages first
-        if ext == ".pdf":
-            self._extract_pages_from_pdf(input_file)
+        if ext == ".pdf" and fitz is not None:
+            # Render PDF pages in memory as they are needed
+            total_pages, pages = self._render_pdf_pages(input_file)
         else:
-            # For single image, just copy it to pages directory
-            target_file = os.path.join(self.pages_dir, "page-001.jpg")
-            shutil.copy(input_file, target_file)
-        
-        # Process each page with OCR
-        page_files = sorted([f for f in os.listdir(self.pages_dir) if f.startswith("page-")])
-        total_pages = len(page_files)
+            # For PDF files, extract pages first
+            if ext == ".pdf":
+                page_files = self._extract_pages_from_pdf(input_file)
+            else:
+                # A single image is read where it is
+                page_files = [input_file]
+            
+            # Process each page with OCR
+            total_pages = len(page_files)
+            pages = ((i + 1, page_file) for i, page_file in enumerate(page_files))
         
         logger.info("Processing %d pages for OCR", total_pages)
         
-        # Initialize result containers
-        all_text = ""
-        page_confidences = []
+        # OCR the pages in parallel, reporting progress as they finish. Pages
+        # are rendered on this thread while the workers OCR earlier ones,
+        # keeping at most max_pending of them in memory.
+        self._page_confidence = np.zeros(total_pages, dtype=np.float64)
+        self._page_word_count = np.zeros(total_pages, dtype=np.int32)
+        self._page_blank = np.zeros(total_pages, dtype=bool)
+        self._page_errors = {}
+        page_texts = [None] * total_pages  # None for pages that failed
+        # OMP_THREAD_LIMIT is set at startup (see cli.limit_ocr_threads) so
+        # parallel pages don't oversubscribe the CPU
+        workers = max(1, min(self.max_workers, total_pages))
         
-        # Process each page
-        for i, page_file in enumerate(page_files):
-            page_num = i + 1
-            self.update_progress((i / total_pages) * 100)
+        max_pending = 2 * workers
+        pages_done = 0
+        # Report progress about once per percent on long documents
+        progress_step = max(1, total_pages // 100)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") as executor:
+                pending = {}  # future -> page index
+                exhausted = False
+                while True:
+                    while not exhausted and len(pending) < max_pending:
+                        page = next(pages, None)
+                        if page is None:
+                            exhausted = True
+                        else:
+                            page_num, page_image = page
+                            if page_num == 1 and self.deskew:
+                                self._skew_angle = estimate_skew_angle(page_image)
+                            pending[executor.submit(self._ocr_page, page_num, page_image)] = page_num - 1
+                    
+                    if not pending:
+                        break
+                    
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        page_texts[pending.pop(future)] = future.result()
+                        pages_done += 1
+                        if pages_done % progress_step == 0 or pages_done == total_pages:
+                            self.update_progress((pages_done / total_pages) * 100)
+        finally:
+            self._close_tesserocr_apis()
+        
+        # Combine the page texts in page order
+        text_parts = []
+        for i, text in enumerate(page_texts):
+            if text is None:
+                continue
             
-            try:
-                # Full path to image file
-                image_path = os.path.join(self.pages_dir, page_file)
-                
-                # Preprocess the image
-                preprocessed_image = preprocess_image(
-                    image_path,
-                    grayscale=self.grayscale,
-                    denoise=self.denoise,
-                    deskew=self.deskew,
-                    contrast_enhance=self.contrast_enhance
-                )
-                
-                # Perform OCR on the preprocessed image
-                logger.debug("Performing OCR on page %d", page_num)
-                
-                # Configure OCR options
-                config = f"--psm {self.psm} --oem {self.oem}"
-                
-                # Extract text
-                ocr_data = pytesseract.image_to_data(
-                    preprocessed_image, 
-                    lang=self.language,
-                    output_type=pytesseract.Output.DICT,
-                    config=config
-                )
-                
-                # Extract text and confidence from OCR data
-                text = " ".join([word for word in ocr_data["text"] if word.strip()])
-                confidences = [conf for conf in ocr_data["conf"] if conf > 0]
-                
-                # Calculate page confidence
-                page_confidence = sum(confidences) / len(confidences) if confidences else 0
-                page_confidences.append(page_confidence)
-                
-                # Add page separator
-                if all_text:
-                    all_text += "\\n\\n----- Page " + str(page_num) + " -----\\n\\n"
-                else:
-                    all_text += "----- Page " + str(page_num) + " -----\\n\\n"
-                
-                all_text += text
-                
-                # Count characters
-                self.characters_recognized += len(text)
-                
-                # Track page details
-                self.page_details.append({
-                    "page_number": page_num,
-                    "confidence_score": page_confidence,
-                    "word_count": len([w for w in ocr_data["text"] if w.strip()])
-                })
-                
-                self.pages_processed += 1
-                
-            except Exception as e:
-                logger.error("Error processing page %d: %s", page_num, str(e), exc_info=True)
-                self.page_details.append({
-                    "page_number": page_num,
-                    "error": str(e)
-                })
+            # Add page separator
+            if text_parts:
+                text_parts.append(f"\n\n----- Page {i + 1} -----\n\n")
+            else:
+                text_parts.append(f"----- Page {i + 1} -----\n\n")
+            
+            text_parts.append(text)
+            
+            # Count characters
+            self.characters_recognized += len(text)
+        
+        all_text = "".join(text_parts)
+        
+        # Calculate overall confidence over the pages that were processed
+        processed = np.ones(total_pages, dtype=bool)
+        processed[list(self._page_errors)] = False
+        self.pages_processed = int(processed.sum())
+        if self.pages_processed:
+            self.overall_confidence = float(self._page_confidence[processed].mean())
+        
+        # Track page details
+        self.page_details = self._build_page_details()
         
         # Save the combined text to output file
         output_file = self._save_output(all_text)
         
-        # Calculate overall confidence
-        self.overall_confidence = sum(page_confidences) / len(page_confidences) if page_confidences else 0
-        
         # Return the result
         return {
             "output_file": output_file,
-            "text_content": all_text[:10000] if len(all_text) <= 10000 else all_text[:10000] + "... [truncated]",
+            "text_content": all_text if len(all_text) <= 10000 else all_text[:10000] + "... [truncated]",
             "pages_processed": self.pages_processed,
             "characters_recognized": self.characters_recognized,
             "confidence_score": self.overall_confidence,
-            "processing_time_seconds": (time.time() - self.start_time.timestamp()),
+            "processing_time_seconds": self.elapsed_seconds(),
             "page_details": self.page_details
         }
     
-    def _extract_pages_from_pdf(self, pdf_path: str):
+    def _ocr_page(self, page_num: int, page_image: Union[str, Image.Image]) -> Optional[str]:
+        """
+        Preprocess and OCR a single page. Runs on the OCR worker threads.
+        
+        The page's confidence and word count, or its error, are recorded in the
+        per-page results.
+        
+        Args:
+            page_num (int): Page number (1-based)
+            page_image (Union[str, Image.Image]): Path to the page image, or the
+                rendered page
+            
+        Returns:
+            Optional[str]: Page text, or None if the page could not be processed
+        """
+        try:
+            # Preprocess the image
+            if self._needs_preprocessing:
+                preprocessed_image = preprocess_image(
+                    page_image,
+                    grayscale=self.grayscale,
+                    denoise=self.denoise,
+                    deskew=self.deskew,
+                    contrast_enhance=self.contrast_enhance,
+                    skew_angle=self._skew_angle
+                )
+            else:
+                preprocessed_image = load_image(page_image)
+            
+            # Blank pages (e.g. separator sheets in scans) have no text to find
+            if self.skip_blank_pages and is_blank_page(preprocessed_image):
+                if self._debug_enabled:
+                    logger.debug("Page %d is blank, skipping OCR", page_num)
+                self._page_blank[page_num - 1] = True
+                return ""
+            
+            # Perform OCR on the preprocessed image
+            if self._debug_enabled:
+                logger.debug("Performing OCR on page %d", page_num)
+            
+            if tesserocr is not None:
+                words, confidences = self._recognize_tesserocr(preprocessed_image)
+            else:
+                words, confidences = self._recognize_pytesseract(preprocessed_image)
+            
+            # Calculate page confidence over the words tesseract rated (-1 marks
+            # layout entries that aren't words)
+            confidences = np.asarray(confidences, dtype=np.float64)
+            confidences = confidences[confidences > 0]
+            if confidences.size:
+                self._page_confidence[page_num - 1] = confidences.mean()
+            self._page_word_count[page_num - 1] = len(words)
+            
+            return " ".join(words)
+            
+        except Exception as e:
+            logger.error("Error processing page %d: %s", page_num, str(e), exc_info=True)
+            self._page_errors[page_num - 1] = str(e)
+            return None
+    
+    def _build_page_details(self) -> List[Dict[str, Any]]:
+        """
+        Build the per-page details of the job result from the per-page results.
+        
+        Returns:
+            List[Dict[str, Any]]: page_number with confidence_score and word_count
+                (and skipped_blank for blank pages), or with error for pages that
+                could not be processed
+        """
+        page_details = []
+        per_page = zip(
+            self._page_confidence.tolist(),
+            self._page_word_count.tolist(),
+            self._page_blank.tolist()
+        )
+        for i, (confidence, word_count, blank) in enumerate(per_page):
+            error = self._page_errors.get(i)
+            if error is not None:
+                page_details.append({"page_number": i + 1, "error": error})
+                continue
+            
+            details = {
+                "page_number": i + 1,
+                "confidence_score": confidence,
+                "word_count": word_count
+            }
+            if blank:
+                details["skipped_blank"] = True
+            page_details.append(details)
+        return page_details
+    
+    def _recognize_pytesseract(self, image: Image.Image) -> Tuple[List[str], List[float]]:
+        """
+        OCR an image by running the tesseract binary.
+        
+        Args:
+            image (Image.Image): Preprocessed page image
+            
+        Returns:
+            Tuple[List[str], List[float]]: Recognized words and their confidences
+        """
+        # Imported on first use, not at agent startup: nodes with tesserocr
+        # or without OCR jobs never need it
+        import pytesseract
+        
+        # Extract text as tesseract's TSV output
+        tsv = pytesseract.image_to_data(
+            image, 
+            lang=self.language,
+            output_type=pytesseract.Output.STRING,
+            config=self._tesseract_config
+        )
+        
+        # Extract text and confidence from OCR data. Only the last two of the
+        # 12 columns are used, so don't build a dict of all of them.
+        words = []
+        confidences = []
+        for row in tsv.splitlines()[1:]:
+            fields = row.split("\t")
+            if len(fields) < 12:
+                continue
+            confidences.append(float(fields[10]))
+            if fields[11].strip():
+                words.append(fields[11])
+        return words, confidences
+    
+    def _recognize_tesserocr(self, image: Image.Image) -> Tuple[List[str], List[float]]:
+        """
+        OCR an image with this worker thread's in-process tesseract API.
+        
+        Args:
+            image (Image.Image): Preprocessed page image
+            
+        Returns:
+            Tuple[List[str], List[float]]: Recognized words and their confidences
+        """
+        api = getattr(self._tesserocr_local, "api", None)
+        if api is None:
+            # Loads the language models once per worker thread
+            api = tesserocr.PyTessBaseAPI(lang=self.language, psm=self.psm, oem=self.oem)
+            self._tesserocr_local.api = api
+            self._tesserocr_apis.append(api)
+        
+        api.SetImage(image)
+        words = api.GetUTF8Text().split()
+        return words, api.AllWordConfidences()
+    
+    def _close_tesserocr_apis(self):
+        """Release the tesserocr API instances of the OCR worker threads."""
+        for api in self._tesserocr_apis:
+            api.End()
+        self._tesserocr_apis = []
+        self._tesserocr_local = threading.local()
+    
+    def _render_pdf_pages(self, pdf_path: str) -> Tuple[int, Iterator[Tuple[int, Image.Image]]]:
+        """
+        Open a PDF file for rendering its pages in memory with PyMuPDF.
+        
+        Args:
+            pdf_path (str): Path to the PDF file
+            
+        Returns:
+            Tuple[int, Iterator[Tuple[int, Image.Image]]]: Number of pages, and an
+                iterator rendering (page number, page image) pairs one at a time
+        """
+        logger.info("Rendering pages from PDF: %s", pdf_path)
+        
+        doc = fitz.open(pdf_path)
+        if doc.page_count == 0:
+            doc.close()
+            raise Exception("No pages in PDF")
+        
+        logger.info("Rendering %d pages from PDF", doc.page_count)
+        return doc.page_count, self._iter_pdf_pages(doc)
+    
+    def _iter_pdf_pages(self, doc) -> Iterator[Tuple[int, Image.Image]]:
+        """
+        Render the pages of an open PDF document, closing it when done.
+        
+        Args:
+            doc (fitz.Document): Open PDF document
+            
+        Yields:
+            Tuple[int, Image.Image]: Page number (1-based) and page image
+        """
+        # Render grayscale pages directly, a third of the pixel data of RGB
+        if self.grayscale:
+            colorspace, mode = fitz.csGRAY, "L"
+        else:
+            colorspace, mode = fitz.csRGB, "RGB"
+        
+        try:
+            for i, page in enumerate(doc):
+                pixmap = page.get_pixmap(dpi=self.dpi, colorspace=colorspace)
+                yield i + 1, Image.frombytes(mode, (pixmap.width, pixmap.height), pixmap.samples)
+        finally:
+            doc.close()
+    
+    def _extract_pages_from_pdf(self, pdf_path: str) -> List[str]:
         """
         Extract pages from a PDF file as images.
         
         Args:
             pdf_path (str): Path to the PDF file
+            
+        Returns:
+            List[str]: Paths of the page images, in page order
         """
         logger.info("Extracting pages from PDF: %s", pdf_path)
         
         try:
+            os.makedirs(self.pages_dir, exist_ok=True)
+            
             # Use poppler's pdftoppm to convert PDF pages to images
             # This requires poppler-utils to be installed
             command = [
@@ -234,14 +480,23 @@ class OCRJob(BaseJob):
                 check=True
             )
             
-            logger.debug("PDF extraction output: %s", process.stdout)
+            if self._debug_enabled:
+                logger.debug("PDF extraction output: %s", process.stdout)
             
             # Check if pages were extracted
-            pages = [f for f in os.listdir(self.pages_dir) if f.startswith("page-")]
+            # Sort by page number rather than by name, pdftoppm's zero padding
+            # depends on the page count
+            with os.scandir(self.pages_dir) as entries:
+                pages = sorted(
+                    (entry.path for entry in entries
+                     if entry.name.startswith("page-") and entry.name.endswith(".jpg")),
+                    key=lambda path: int(os.path.basename(path)[5:-4])
+                )
             if not pages:
                 raise Exception("No pages extracted from PDF")
             
             logger.info("Extracted %d pages from PDF", len(pages))
+            return pages
             
         except subprocess.CalledProcessError as e:
             logger.error("Error extracting pages from PDF: %s", e.stderr)
@@ -266,11 +521,10 @@ class OCRJob(BaseJob):
         
         if self.output_format == "txt":
             output_path = os.path.join(self.output_dir, f"{base_name}.txt")
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(text)
+            with open(output_path, "wb") as f:
+                f.write(text.encode("utf-8"))
                 
         elif self.output_format == "json":
-            import json
             output_path = os.path.join(self.output_dir, f"{base_name}.json")
             data = {
                 "job_id": self.job_id,
@@ -280,16 +534,16 @@ class OCRJob(BaseJob):
                 "pages_processed": self.pages_processed,
                 "characters_recognized": self.characters_recognized
             }
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            with open(output_path, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         # Other formats would be implemented here
         
         else:
             # Default to txt for now
             output_path = os.path.join(self.output_dir, f"{base_name}.txt")
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(text)
+            with open(output_path, "wb") as f:
+                f.write(text.encode("utf-8"))
         
         logger.info("Saved OCR output to %s", output_path)
         return output_path
\ No newline at end of file
@@ -4,14 +4,18 @@ PDF Parse Job
 Implementation of PDF parsing job for the GoPine system.
 """
 
-import json
+import io
+import itertools
 import logging
+import multiprocessing
 import os
+import re
 import subprocess
-import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional, Tuple
 
-import PyPDF2
+import orjson
+import pypdf
 import tabula
 import camelot
 
@@ -19,6 +23,181 @@ from gopine_node_agent.jobs.base_job import BaseJob
 
 logger = logging.getLogger(__name__)
 
+# Below this many pages text is extracted in the job's own process: worker
+# processes have to start up and parse the PDF again
+PARALLEL_TEXT_MIN_PAGES = 32
+
+# Maps every whitespace character (the last one is U+3000) to a plain space,
+# after which only runs of spaces are left to collapse
+_WHITESPACE_TABLE = str.maketrans({chr(c): " " for c in range(0x3001) if chr(c).isspace()})
+_MULTI_SPACE_RE = re.compile(" {2,}")
+
+# A page number or an inclusive "start-end" range in a page range string
+_PAGE_SPAN_RE = re.compile(r"(\d+)(?:\s*-\s*(\d+))?")
+
+# Number of table CSV files written at a time
+TABLE_WRITE_WORKERS = 4
+
+# Camelot reads long page lists in chunks of this many pages, with up to
+# CAMELOT_WORKERS worker processes
+CAMELOT_CHUNK_PAGES = 8
+CAMELOT_WORKERS = 4
+
+# Output JSON files are indented; PDF dictionaries may have non-string keys
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _json_default(obj: Any) -> Any:
+    """
+    Convert values orjson doesn't serialize natively, e.g. pypdf's
+    FloatObject (a float subclass) and other PDF objects.
+    
+    Args:
+        obj (Any): Value to convert
+        
+    Returns:
+        Any: JSON serializable value
+    """
+    if isinstance(obj, float):
+        return float(obj)
+    return str(obj)
+
+def _compact_page_ranges(pages: List[int]) -> str:
+    """
+    Format page numbers as a page range string, with runs of consecutive
+    pages as ranges (e.g. [1, 3, 4, 5] becomes "1,3-5").
+    
+    Args:
+        pages (List[int]): Page numbers
+        
+    Returns:
+        str: Page range string
+    """
+    parts = []
+    start = 0
+    for i in range(1, len(pages) + 1):
+        if i == len(pages) or pages[i] != pages[i - 1] + 1:
+            if i - start > 1:
+                parts.append(f"{pages[start]}-{pages[i - 1]}")
+            else:
+                parts.append(str(pages[start]))
+            start = i
+    return ",".join(parts)
+
+def _camelot_read_pdf(pdf_path: str, pages: str, flavor: str) -> List:
+    """
+    Read tables from PDF pages with camelot.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        pages (str): Page range string (1-indexed)
+        flavor (str): Camelot table parsing method ("lattice" or "stream")
+        
+    Returns:
+        List: Camelot tables
+    """
+    return list(camelot.read_pdf(pdf_path, pages=pages, flavor=flavor))
+
+def _read_file(path: str) -> bytes:
+    """
+    Read a whole file with a single read, hinting sequential access so the
+    kernel reads ahead in large requests.
+    
+    Args:
+        path (str): Path to the file
+        
+    Returns:
+        bytes: File contents
+    """
+    with open(path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f.read()
+
+def _page_text(page: pypdf.PageObject, preserve_formatting: bool, include_line_breaks: bool) -> str:
+    """
+    Extract the text of a PDF page.
+    
+    Args:
+        page (pypdf.PageObject): PDF page
+        preserve_formatting (bool): Keep the extracted whitespace as is
+        include_line_breaks (bool): Keep line breaks
+        
+    Returns:
+        str: Page text
+    """
+    # A page without a content stream (e.g. a blank page) has no text, and
+    # needs no extractor setup
+    if page.get("/Contents") is None:
+        return ""
+    
+    # Extract text from the page
+    page_text = page.extract_text()
+    
+    # Process text based on options
+    if not preserve_formatting:
+        # Remove extra whitespace
+        page_text = _MULTI_SPACE_RE.sub(" ", page_text.translate(_WHITESPACE_TABLE)).strip()
+    
+    if not include_line_breaks:
+        # Replace line breaks with spaces
+        page_text = page_text.replace("\n", " ")
+    
+    return page_text
+
+def _read_pages_text(
+    pdf_pages: List[pypdf.PageObject],
+    page_nums: List[int],
+    preserve_formatting: bool,
+    include_line_breaks: bool
+) -> List[Tuple[int, Optional[str]]]:
+    """
+    Extract the text of some pages of a PDF.
+    
+    Args:
+        pdf_pages (List[pypdf.PageObject]): Pages of the PDF
+        page_nums (List[int]): Page numbers (0-indexed)
+        preserve_formatting (bool): Keep the extracted whitespace as is
+        include_line_breaks (bool): Keep line breaks
+        
+    Returns:
+        List[Tuple[int, Optional[str]]]: Page number and text pairs (text is
+            None for pages whose text couldn't be extracted)
+    """
+    results = []
+    for page_num in page_nums:
+        try:
+            results.append((page_num, _page_text(pdf_pages[page_num], preserve_formatting, include_line_breaks)))
+        except Exception as e:
+            logger.error("Error extracting text from page %d: %s", page_num + 1, str(e))
+            results.append((page_num, None))
+    return results
+
+def _extract_pages_text(
+    pdf_path: str,
+    password: Optional[str],
+    page_nums: List[int],
+    preserve_formatting: bool,
+    include_line_breaks: bool
+) -> List[Tuple[int, Optional[str]]]:
+    """
+    Extract the text of some pages of a PDF in a worker process, which opens
+    the PDF itself rather than receiving the reader.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        password (Optional[str]): Password of an encrypted PDF
+        page_nums (List[int]): Page numbers (0-indexed)
+        preserve_formatting (bool): Keep the extracted whitespace as is
+        include_line_breaks (bool): Keep line breaks
+        
+    Returns:
+        List[Tuple[int, Optional[str]]]: Page number and text pairs
+    """
+    pdf = pypdf.PdfReader(pdf_path)
+    if pdf.is_encrypted and password:
+        pdf.decrypt(password)
+    return _read_pages_text(pdf.pages, page_nums, preserve_formatting, include_line_breaks)
+
 class PDFParseJob(BaseJob):
     """
     PDF parsing job implementation.
@@ -47,6 +226,12 @@ class PDFParseJob(BaseJob):
         self.text_options = self.parameters.get("text_extraction_options", {})
         self.form_options = self.parameters.get("form_extraction_options", {})
         
+        # Path of the PDF being parsed, for worker processes
+        self._pdf_path = None
+        
+        # Pages of the PDF, looked up once for all tasks
+        self._pages = []
+        
         # Results tracking
         self.pages_processed = 0
         self.task_results = {}
@@ -105,7 +290,7 @@ class PDFParseJob(BaseJob):
             page_range = task.get("page_range", "all")
             
             # Convert page range to list of page numbers
-            pages = self._parse_page_range(page_range, pdf.getNumPages())
+            pages = self._parse_page_range(page_range, len(self._pages))
             
             try:
                 if task_type == "text":
@@ -117,7 +302,7 @@ class PDFParseJob(BaseJob):
                 elif task_type == "forms":
                     self._extract_forms(pdf, pages)
                 elif task_type == "images":
-                    self._extract_images(input_file, pages)
+                    self._extract_images(pdf, pages)
                 elif task_type == "structure":
                     self._extract_structure(pdf, pages)
             except Exception as e:
@@ -132,12 +317,12 @@ class PDFParseJob(BaseJob):
         return {
             "output_files": self.output_files,
             "pages_processed": self.pages_processed,
-            "processing_time_seconds": (time.time() - self.start_time.timestamp()),
+            "processing_time_seconds": self.elapsed_seconds(),
             "metadata": self.task_results.get("metadata", {}),
             "task_results": self.task_results
         }
     
-    def _open_pdf(self, pdf_path: str) -> PyPDF2.PdfReader:
+    def _open_pdf(self, pdf_path: str) -> pypdf.PdfReader:
         """
         Open a PDF file and return a PdfReader object.
         
@@ -145,15 +330,18 @@ class PDFParseJob(BaseJob):
             pdf_path (str): Path to the PDF file
             
         Returns:
-            PyPDF2.PdfReader: PDF reader object
+            pypdf.PdfReader: PDF reader object
         """
         try:
-            pdf = PyPDF2.PdfReader(pdf_path)
+            pdf = pypdf.PdfReader(io.BytesIO(_read_file(pdf_path)))
+            self._pdf_path = pdf_path
             
             # Handle encrypted PDFs
             if pdf.is_encrypted and self.password:
                 pdf.decrypt(self.password)
             
+            self._pages = list(pdf.pages)
+            
             return pdf
         except Exception as e:
             logger.error("Error opening PDF: %s", str(e), exc_info=True)
@@ -173,29 +361,20 @@ class PDFParseJob(BaseJob):
         if page_range == "all":
             return list(range(total_pages))
         
-        pages = []
-        parts = page_range.split(",")
-        
-        for part in parts:
-            if "-" in part:
-                start, end = part.split("-")
-                start = int(start) - 1  # Convert to 0-indexed
-                end = int(end)  # End is exclusive, so no need to subtract 1
-                pages.extend(range(start, end))
-            else:
-                pages.append(int(part) - 1)  # Convert to 0-indexed
-        
-        # Filter out invalid page numbers
-        pages = [p for p in pages if 0 <= p < total_pages]
-        
-        return pages
+        # Scan all parts in one pass into 0-indexed, end-exclusive spans,
+        # clipped to the document so huge ranges don't build huge lists
+        spans = (
+            (max(int(start) - 1, 0), min(int(end or start), total_pages))
+            for start, end in _PAGE_SPAN_RE.findall(page_range)
+        )
+        return list(itertools.chain.from_iterable(range(start, end) for start, end in spans))
     
-    def _extract_text(self, pdf: PyPDF2.PdfReader, pages: List[int]):
+    def _extract_text(self, pdf: pypdf.PdfReader, pages: List[int]):
         """
         Extract text from PDF pages.
         
         Args:
-            pdf (PyPDF2.PdfReader): PDF reader object
+            pdf (pypdf.PdfReader): PDF reader object
             pages (List[int]): List of page numbers to extract
         """
         logger.info("Extracting text from %d pages", len(pages))
@@ -203,49 +382,45 @@ class PDFParseJob(BaseJob):
         preserve_formatting = self.text_options.get("preserve_formatting", True)
         include_line_breaks = self.text_options.get("include_line_breaks", True)
         
-        extracted_text = ""
+        # Text extraction is CPU-bound Python code, so long documents are
+        # split across worker processes
+        workers = self.text_options.get("workers") or min(os.cpu_count() or 1, 8)
+        if workers > 1 and len(pages) >= PARALLEL_TEXT_MIN_PAGES:
+            page_texts = self._extract_text_parallel(
+                pages, workers, preserve_formatting, include_line_breaks
+            )
+        else:
+            # Extracted in steps of 5% of the pages to update the progress
+            page_texts = []
+            step = max(1, len(pages) // 20)
+            for i in range(0, len(pages), step):
+                self.update_progress((i / len(pages)) * 100)
+                page_texts.extend(
+                    _read_pages_text(self._pages, pages[i:i + step], preserve_formatting, include_line_breaks)
+                )
+        
         character_count = 0
         word_count = 0
         
-        for i, page_num in enumerate(pages):
-            self.update_progress((i / len(pages)) * 100)
-            
-            try:
-                page = pdf.pages[page_num]
-                
-                # Extract text from the page
-                page_text = page.extract_text()
-                
-                # Process text based on options
-                if not preserve_formatting:
-                    # Remove extra whitespace
-                    page_text = " ".join(page_text.split())
-                
-                if not include_line_breaks:
-                    # Replace line breaks with spaces
-                    page_text = page_text.replace("\n", " ")
+        # Write each page straight to the output file rather than building up
+        # the whole text in memory
+        output_path = os.path.join(self.output_dir, "extracted_text.txt")
+        with open(output_path, "w", encoding="utf-8") as f:
+            separator = ""
+            for page_num, page_text in page_texts:
+                if page_text is None:
+                    continue
                 
                 # Add page separator
-                if extracted_text:
-                    extracted_text += "\n\n----- Page " + str(page_num + 1) + " -----\n\n"
-                else:
-                    extracted_text += "----- Page " + str(page_num + 1) + " -----\n\n"
-                
-                extracted_text += page_text
+                f.write(separator + "----- Page " + str(page_num + 1) + " -----\n\n")
+                f.write(page_text)
+                separator = "\n\n"
                 
                 # Count characters and words
                 character_count += len(page_text)
                 word_count += len(page_text.split())
                 
                 self.pages_processed += 1
-                
-            except Exception as e:
-                logger.error("Error extracting text from page %d: %s", page_num + 1, str(e))
-        
-        # Save to output file
-        output_path = os.path.join(self.output_dir, "extracted_text.txt")
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(extracted_text)
         
         # Record results
         self.output_files["text"] = output_path
@@ -254,6 +429,48 @@ class PDFParseJob(BaseJob):
             "word_count": word_count
         }
     
+    def _extract_text_parallel(
+        self,
+        pages: List[int],
+        workers: int,
+        preserve_formatting: bool,
+        include_line_breaks: bool
+    ) -> List[Tuple[int, Optional[str]]]:
+        """
+        Extract the text of PDF pages in worker processes.
+        
+        Args:
+            pages (List[int]): List of page numbers to extract
+            workers (int): Number of worker processes
+            preserve_formatting (bool): Keep the extracted whitespace as is
+            include_line_breaks (bool): Keep line breaks
+            
+        Returns:
+            List[Tuple[int, Optional[str]]]: Page number and text pairs, in the
+                order of pages
+        """
+        # Several batches per worker balance the load and give progress updates,
+        # while each batch opens the PDF only once
+        batch_size = -(-len(pages) // (workers * 4))  # Rounded up
+        batches = [pages[i:i + batch_size] for i in range(0, len(pages), batch_size)]
+        
+        texts = {}
+        # Spawned rather than forked, the agent process runs other threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches)), mp_context=context) as executor:
+            futures = [
+                executor.submit(
+                    _extract_pages_text, self._pdf_path, self.password, batch,
+                    preserve_formatting, include_line_breaks
+                )
+                for batch in batches
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                texts.update(future.result())
+                self.update_progress((done / len(batches)) * 100)
+        
+        return [(page_num, texts[page_num]) for page_num in pages]
+    
     def _extract_tables(self, pdf_path: str, pages: List[int]):
         """
         Extract tables from PDF pages.
@@ -269,62 +486,54 @@ class PDFParseJob(BaseJob):
         
         # Convert 0-indexed to 1-indexed for tabula and camelot
         pages_1_indexed = [p + 1 for p in pages]
+        if pages == list(range(len(self._pages))):
+            pages_arg = "all"
+        else:
+            pages_arg = _compact_page_ranges(pages_1_indexed)
         
         tables_extracted = 0
         
         try:
             if algorithm == "lattice":
                 # Use camelot for lattice tables (tables with borders)
-                tables = camelot.read_pdf(
-                    pdf_path,
-                    pages=",".join(map(str, pages_1_indexed)),
-                    flavor="lattice"
-                )
+                tables = self._read_camelot_tables(pdf_path, pages_1_indexed, pages_arg, "lattice")
                 tables_extracted = len(tables)
                 
                 # Save tables to CSV files
-                for i, table in enumerate(tables):
-                    output_path = os.path.join(self.output_dir, f"table_{i+1}.csv")
-                    table.to_csv(output_path)
+                self._save_tables(tables, "table_")
                 
             elif algorithm == "stream":
                 # Use tabula for stream tables (tables without borders)
                 tables = tabula.read_pdf(
                     pdf_path,
-                    pages=",".join(map(str, pages_1_indexed)),
+                    pages=pages_arg,
                     multiple_tables=True
                 )
                 tables_extracted = len(tables)
                 
                 # Save tables to CSV files
-                for i, table in enumerate(tables):
-                    output_path = os.path.join(self.output_dir, f"table_{i+1}.csv")
-                    table.to_csv(output_path, index=False)
+                self._save_tables(tables, "table_", index=False)
             
             else:
                 # Default to combined approach
-                lattice_tables = camelot.read_pdf(
-                    pdf_path,
-                    pages=",".join(map(str, pages_1_indexed)),
-                    flavor="lattice"
-                )
+                lattice_tables = self._read_camelot_tables(pdf_path, pages_1_indexed, pages_arg, "lattice")
                 
-                stream_tables = camelot.read_pdf(
-                    pdf_path,
-                    pages=",".join(map(str, pages_1_indexed)),
-                    flavor="stream"
-                )
+                # Only look for borderless tables on pages where no bordered
+                # ones were found, instead of parsing every page twice
+                lattice_pages = {int(table.page) for table in lattice_tables}
+                stream_pages = [p for p in pages_1_indexed if p not in lattice_pages]
+                if stream_pages:
+                    stream_tables = self._read_camelot_tables(
+                        pdf_path, stream_pages, _compact_page_ranges(stream_pages), "stream"
+                    )
+                else:
+                    stream_tables = []
                 
                 tables_extracted = len(lattice_tables) + len(stream_tables)
                 
                 # Save tables to CSV files
-                for i, table in enumerate(lattice_tables):
-                    output_path = os.path.join(self.output_dir, f"lattice_table_{i+1}.csv")
-                    table.to_csv(output_path)
-                
-                for i, table in enumerate(stream_tables):
-                    output_path = os.path.join(self.output_dir, f"stream_table_{i+1}.csv")
-                    table.to_csv(output_path)
+                self._save_tables(lattice_tables, "lattice_table_")
+                self._save_tables(stream_tables, "stream_table_")
             
             # Create combined JSON file for tables
             tables_json_path = os.path.join(self.output_dir, "tables.json")
@@ -334,8 +543,8 @@ class PDFParseJob(BaseJob):
                 "algorithm": algorithm
             }
             
-            with open(tables_json_path, "w", encoding="utf-8") as f:
-                json.dump(tables_info, f, indent=2)
+            with open(tables_json_path, "wb") as f:
+                f.write(orjson.dumps(tables_info, option=_JSON_OPTIONS, default=_json_default))
             
             # Record results
             self.output_files["tables"] = os.path.join(self.output_dir, "tables")
@@ -349,12 +558,75 @@ class PDFParseJob(BaseJob):
             logger.error("Error extracting tables: %s", str(e), exc_info=True)
             raise
     
-    def _extract_metadata(self, pdf: PyPDF2.PdfReader):
+    def _read_camelot_tables(
+        self,
+        pdf_path: str,
+        pages_1_indexed: List[int],
+        pages_arg: str,
+        flavor: str
+    ) -> List:
+        """
+        Read tables with camelot, splitting long page lists into chunks that
+        are read in parallel.
+        
+        Args:
+            pdf_path (str): Path to the PDF file
+            pages_1_indexed (List[int]): Page numbers (1-indexed)
+            pages_arg (str): Page range string of all the pages
+            flavor (str): Camelot table parsing method ("lattice" or "stream")
+            
+        Returns:
+            List: Camelot tables, in page order
+        """
+        chunks = [
+            pages_1_indexed[i:i + CAMELOT_CHUNK_PAGES]
+            for i in range(0, len(pages_1_indexed), CAMELOT_CHUNK_PAGES)
+        ]
+        if len(chunks) <= 1:
+            return _camelot_read_pdf(pdf_path, pages_arg, flavor)
+        
+        # Worker processes rather than threads: camelot renders pages through
+        # Ghostscript's library, which can't be used concurrently in a process,
+        # and parses them in Python code holding the GIL
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(CAMELOT_WORKERS, len(chunks)), mp_context=context) as executor:
+            results = executor.map(
+                _camelot_read_pdf,
+                itertools.repeat(pdf_path),
+                [_compact_page_ranges(chunk) for chunk in chunks],
+                itertools.repeat(flavor)
+            )
+            return [table for tables in results for table in tables]
+    
+    def _save_tables(self, tables, prefix: str, **kwargs):
+        """
+        Save tables to numbered CSV files in the output directory, writing
+        several files at a time.
+        
+        Args:
+            tables: Camelot tables or pandas DataFrames
+            prefix (str): File name prefix, followed by the table number
+            **kwargs: Arguments for the tables' to_csv method
+        """
+        def save_table(item):
+            i, table = item
+            table.to_csv(os.path.join(self.output_dir, f"{prefix}{i+1}.csv"), **kwargs)
+        
+        if len(tables) <= 1:
+            for item in enumerate(tables):
+                save_table(item)
+            return
+        
+        with ThreadPoolExecutor(max_workers=TABLE_WRITE_WORKERS, thread_name_prefix="tablecsv") as executor:
+            # Consumed to raise the first error, if any
+            list(executor.map(save_table, enumerate(tables)))
+    
+    def _extract_metadata(self, pdf: pypdf.PdfReader):
         """
         Extract metadata from the PDF.
         
         Args:
-            pdf (PyPDF2.PdfReader): PDF reader object
+            pdf (pypdf.PdfReader): PDF reader object
         """
         logger.info("Extracting metadata from PDF")
         
@@ -373,12 +645,12 @@ class PDFParseJob(BaseJob):
                     metadata[clean_key] = str(value)
             
             # Add basic PDF information
-            metadata["page_count"] = len(pdf.pages)
+            metadata["page_count"] = len(self._pages)
             
             # Save to output file
             output_path = os.path.join(self.output_dir, "metadata.json")
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2)
+            with open(output_path, "wb") as f:
+                f.write(orjson.dumps(metadata, option=_JSON_OPTIONS, default=_json_default))
             
             # Record results
             self.output_files["metadata"] = output_path
@@ -388,12 +660,12 @@ class PDFParseJob(BaseJob):
             logger.error("Error extracting metadata: %s", str(e), exc_info=True)
             raise
     
-    def _extract_forms(self, pdf: PyPDF2.PdfReader, pages: List[int]):
+    def _extract_forms(self, pdf: pypdf.PdfReader, pages: List[int]):
         """
         Extract form fields from PDF pages.
         
         Args:
-            pdf (PyPDF2.PdfReader): PDF reader object
+            pdf (pypdf.PdfReader): PDF reader object
             pages (List[int]): List of page numbers to extract
         """
         logger.info("Extracting form fields")
@@ -401,8 +673,12 @@ class PDFParseJob(BaseJob):
         include_field_properties = self.form_options.get("include_field_properties", True)
         
         try:
-            # Get form fields
-            fields = pdf.get_form_text_fields()
+            # Get form fields; most PDFs have no interactive form, which the
+            # document catalog tells without walking the field tree
+            if pdf.trailer["/Root"].get("/AcroForm") is None:
+                fields = {}
+            else:
+                fields = pdf.get_form_text_fields()
             
             if include_field_properties:
                 # This would require more detailed form field extraction
@@ -411,8 +687,8 @@ class PDFParseJob(BaseJob):
             
             # Save to output file
             output_path = os.path.join(self.output_dir, "form_fields.json")
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(fields, f, indent=2)
+            with open(output_path, "wb") as f:
+                f.write(orjson.dumps(fields, option=_JSON_OPTIONS, default=_json_default))
             
             # Record results
             self.output_files["forms"] = output_path
@@ -424,12 +700,12 @@ class PDFParseJob(BaseJob):
             logger.error("Error extracting form fields: %s", str(e), exc_info=True)
             self.task_results["forms"] = {"error": str(e)}
     
-    def _extract_images(self, pdf_path: str, pages: List[int]):
+    def _extract_images(self, pdf: pypdf.PdfReader, pages: List[int]):
         """
         Extract images from PDF pages.
         
         Args:
-            pdf_path (str): Path to the PDF file
+            pdf (pypdf.PdfReader): PDF reader object
             pages (List[int]): List of page numbers to extract
         """
         logger.info("Extracting images from %d pages", len(pages))
@@ -441,20 +717,29 @@ class PDFParseJob(BaseJob):
         images_extracted = 0
         
         try:
-            # This is a simplified implementation
-            # In a real implementation, we would use pdfimages (from poppler-utils)
-            # or a Python library like PyMuPDF (fitz) to extract images
-            
-            # For demonstration, just create a sample image info file
+            # The images are read from the already parsed PDF, with their
+            # original encoding where possible (e.g. JPEG streams as is)
+            images = []
+            for page_num in pages:
+                try:
+                    for image in self._pages[page_num].images:
+                        file_name = f"page_{page_num + 1}_{image.name}"
+                        with open(os.path.join(images_dir, file_name), "wb") as f:
+                            f.write(image.data)
+                        images.append({"page_number": page_num + 1, "file": file_name})
+                except Exception as e:
+                    logger.error("Error extracting images from page %d: %s", page_num + 1, str(e))
+            
+            images_extracted = len(images)
             image_info = {
-                "message": "Image extraction would be implemented here",
+                "images": images,
                 "pages_processed": len(pages)
             }
             
             # Save to output file
             output_path = os.path.join(self.output_dir, "images_info.json")
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(image_info, f, indent=2)
+            with open(output_path, "wb") as f:
+                f.write(orjson.dumps(image_info, option=_JSON_OPTIONS, default=_json_default))
             
             # Record results
             self.output_files["images"] = images_dir
@@ -468,12 +753,12 @@ class PDFParseJob(BaseJob):
             logger.error("Error extracting images: %s", str(e), exc_info=True)
             self.task_results["images"] = {"error": str(e)}
     
-    def _extract_structure(self, pdf: PyPDF2.PdfReader, pages: List[int]):
+    def _extract_structure(self, pdf: pypdf.PdfReader, pages: List[int]):
         """
         Extract document structure from PDF pages.
         
         Args:
-            pdf (PyPDF2.PdfReader): PDF reader object
+            pdf (pypdf.PdfReader): PDF reader object
             pages (List[int]): List of page numbers to extract
         """
         logger.info("Extracting document structure from %d pages", len(pages))
@@ -485,8 +770,8 @@ class PDFParseJob(BaseJob):
             # Basic page structure information
             page_info = []
             for page_num in pages:
-                if page_num < len(pdf.pages):
-                    page = pdf.pages[page_num]
+                if page_num < len(self._pages):
+                    page = self._pages[page_num]
                     
                     # Basic page information
                     page_info.append({
@@ -504,8 +789,8 @@ class PDFParseJob(BaseJob):
             
             # Save to output file
             output_path = os.path.join(self.output_dir, "structure.json")
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(structure_info, f, indent=2)
+            with open(output_path, "wb") as f:
+                f.write(orjson.dumps(structure_info, option=_JSON_OPTIONS, default=_json_default))
             
             # Record results
             self.output_files["structure"] = output_path
@@ -515,26 +800,49 @@ class PDFParseJob(BaseJob):
             logger.error("Error extracting structure: %s", str(e), exc_info=True)
             raise
     
-    def _extract_outline(self, pdf: PyPDF2.PdfReader) -> List[Dict]:
+    def _extract_outline(self, pdf: pypdf.PdfReader) -> List[Dict]:
         """
         Extract document outline (bookmarks) from PDF.
         
         Args:
-            pdf (PyPDF2.PdfReader): PDF reader object
+            pdf (pypdf.PdfReader): PDF reader object
             
         Returns:
             List[Dict]: Document outline
         """
-        # This is a simplified implementation
-        # PyPDF2's outline extraction is limited
-        # In a real implementation, we would use a more robust library
-        
         try:
-            outline = pdf.outline
-            return outline
+            return self._convert_outline(pdf, pdf.outline)
         except Exception:
             return []
     
+    def _convert_outline(self, pdf: pypdf.PdfReader, items: list) -> List[Dict]:
+        """
+        Convert pypdf outline items to plain, JSON-serializable entries.
+        
+        Args:
+            pdf (pypdf.PdfReader): PDF reader object
+            items (list): Outline items; a nested list holds the children of
+                the item before it
+            
+        Returns:
+            List[Dict]: Outline entries with title, page_number (1-based, None
+                if unknown) and children
+        """
+        outline = []
+        for item in items:
+            if isinstance(item, list):
+                if outline:
+                    outline[-1]["children"] = self._convert_outline(pdf, item)
+                continue
+            
+            page_index = pdf.get_destination_page_number(item)
+            outline.append({
+                "title": item.title,
+                "page_number": page_index + 1 if page_index is not None and page_index >= 0 else None,
+                "children": []
+            })
+        return outline
+    
     def _get_rect_values(self, rect) -> Tuple[float, float, float, float]:
         """
         Get rectangle values from a PDF rectangle object.
@@ -545,27 +853,35 @@ class PDFParseJob(BaseJob):
         Returns:
             Tuple[float, float, float, float]: Rectangle values (x1, y1, x2, y2)
         """
-        if hasattr(rect, "as_list"):
-            return tuple(rect.as_list())
-        return (0, 0, 0, 0)
+        # pypdf's RectangleObject is a list of its four numbers
+        try:
+            return tuple(map(float, rect))
+        except (TypeError, ValueError):
+            return (0, 0, 0, 0)
     
     def _create_combined_output(self):
         """Create a combined output file with all results."""
+        # The task results are small summaries, the extracted data itself is
+        # only referenced through the output files; the metadata is the
+        # exception and is written once, at the top level
+        task_results = dict(self.task_results)
+        metadata = task_results.pop("metadata", None)
+        
         combined_output = {
             "job_id": self.job_id,
             "output_files": self.output_files,
-            "task_results": self.task_results,
+            "task_results": task_results,
             "pages_processed": self.pages_processed,
-            "processing_time_seconds": (time.time() - self.start_time.timestamp())
+            "processing_time_seconds": self.elapsed_seconds()
         }
         
         # Add metadata if available
-        if "metadata" in self.task_results:
-            combined_output["metadata"] = self.task_results["metadata"]
+        if metadata is not None:
+            combined_output["metadata"] = metadata
         
         # Save to output file
         output_path = os.path.join(self.output_dir, "combined_results.json")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(combined_output, f, indent=2)
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(combined_output, option=_JSON_OPTIONS, default=_json_default))
         
         self.output_files["combined"] = output_path
\ No newline at end of file
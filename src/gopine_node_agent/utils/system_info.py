@@ -4,17 +4,63 @@ System Information Utilities
 Utilities for gathering system information.
 """
 
+import atexit
 import logging
 import os
 import platform
 import socket
+import time
 import uuid
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Tuple
 
 import psutil
 
 logger = logging.getLogger(__name__)
 
+# Prime the CPU counter: non-blocking cpu_percent() reports usage since the
+# previous call, so the first call in get_system_info() doesn't report 0
+psutil.cpu_percent(interval=None)
+
+# Facts that don't change while the process runs, gathered on first use
+_static_info: Optional[Dict[str, Any]] = None
+_machine_id: Optional[str] = None
+_cpu_frequency_reader: Optional[Callable[[], float]] = None
+
+# Registry key of the first CPU (Windows), opened on first use and kept open
+_cpu0_key = None
+
+# Core counts can't change while the process runs
+_PHYSICAL_CORES = psutil.cpu_count(logical=False)
+_LOGICAL_CORES = psutil.cpu_count(logical=True)
+
+# Nor can the installed memory
+_TOTAL_MEMORY_MB = psutil.virtual_memory().total >> 20
+
+# Number of partitions whose usage is queried at a time
+DISK_PROBE_WORKERS = 8
+
+# Filesystems whose usage isn't reported: no media (empty Windows drives),
+# read-only images, memory-backed and automounter placeholders (statting
+# those would trigger the mount)
+SKIPPED_FSTYPES = frozenset({"", "squashfs", "tmpfs", "devtmpfs", "autofs"})
+
+# Disk partitions and network interfaces rarely change, their lists are
+# reused for this many seconds
+try:
+    SYSINFO_CACHE_TTL = float(os.environ.get("GOPINE_SYSINFO_TTL", "30"))
+except ValueError:
+    SYSINFO_CACHE_TTL = 30.0
+
+# The primary IP address is looked up again after this many seconds
+IP_ADDRESS_CACHE_TTL = 60.0
+
+# str() of the address families seen, there are only a few of them
+_family_names: Dict[int, str] = {}
+
+# Cached values by name, with the (monotonic) time they were fetched
+_ttl_cache: Dict[str, Tuple[float, Any]] = {}
+
 def get_system_info() -> Dict[str, Any]:
     """
     Get detailed system information.
@@ -24,7 +70,87 @@ def get_system_info() -> Dict[str, Any]:
     """
     try:
         # Basic system info
-        system_info = {
+        system_info = dict(_get_static_info())
+        
+        # Disk and network info are gathered in the background, their system
+        # calls block (on network filesystems, possibly for long) but release
+        # the GIL
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="sysinfo") as executor:
+            disk_future = executor.submit(get_disk_info)
+            interfaces_future = executor.submit(get_network_interfaces)
+            ip_address_future = executor.submit(get_ip_address)
+            
+            # CPU info
+            system_info["cpu"] = {
+                "physical_cores": _PHYSICAL_CORES,
+                "logical_cores": _LOGICAL_CORES,
+                "frequency_mhz": get_cpu_frequency(),
+                "usage_percent": psutil.cpu_percent(interval=None)
+            }
+            
+            # Memory info
+            mem = psutil.virtual_memory()
+            system_info["memory"] = {
+                "total_mb": _TOTAL_MEMORY_MB,
+                "available_mb": mem.available >> 20,
+                "used_mb": mem.used >> 20,
+                "percent_used": mem.percent
+            }
+            
+            # Disk info
+            system_info["disk"] = disk_future.result()
+            
+            # Network info
+            system_info["network"] = {
+                "interfaces": interfaces_future.result(),
+                "ip_address": ip_address_future.result()
+            }
+        
+        return system_info
+    
+    except Exception as e:
+        logger.error("Error getting system info: %s", e, exc_info=True)
+        # Return basic info if full info fails
+        return {
+            "hostname": socket.gethostname(),
+            "platform": platform.system(),
+            "error": str(e)
+        }
+
+def _cached(name: str, fetch: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+    """
+    Get a value fetched less than ttl seconds ago, or fetch it.
+    
+    Args:
+        name (str): Cache key
+        fetch (Callable[[], Any]): Function fetching the value
+        ttl (Optional[float]): Time to live in seconds (SYSINFO_CACHE_TTL if None)
+        
+    Returns:
+        Any: Cached or freshly fetched value
+    """
+    if ttl is None:
+        ttl = SYSINFO_CACHE_TTL
+    
+    now = time.monotonic()
+    entry = _ttl_cache.get(name)
+    if entry is None or now - entry[0] >= ttl:
+        entry = (now, fetch())
+        _ttl_cache[name] = entry
+    return entry[1]
+
+def _get_static_info() -> Dict[str, Any]:
+    """
+    Get the system information that doesn't change while the process runs,
+    gathering it on the first call.
+    
+    Returns:
+        Dict[str, Any]: Hostname, machine ID, platform and Python information
+    """
+    global _static_info
+    
+    if _static_info is None:
+        _static_info = {
             "hostname": socket.gethostname(),
             "machine_id": get_machine_id(),
             "platform": {
@@ -40,47 +166,24 @@ def get_system_info() -> Dict[str, Any]:
                 "compiler": platform.python_compiler()
             }
         }
-        
-        # CPU info
-        system_info["cpu"] = {
-            "physical_cores": psutil.cpu_count(logical=False),
-            "logical_cores": psutil.cpu_count(logical=True),
-            "frequency_mhz": get_cpu_frequency(),
-            "usage_percent": psutil.cpu_percent(interval=0.1)
-        }
-        
-        # Memory info
-        mem = psutil.virtual_memory()
-        system_info["memory"] = {
-            "total_mb": mem.total // (1024 * 1024),
-            "available_mb": mem.available // (1024 * 1024),
-            "used_mb": mem.used // (1024 * 1024),
-            "percent_used": mem.percent
-        }
-        
-        # Disk info
-        system_info["disk"] = get_disk_info()
-        
-        # Network info
-        system_info["network"] = {
-            "interfaces": get_network_interfaces(),
-            "ip_address": get_ip_address()
-        }
-        
-        return system_info
-    
-    except Exception as e:
-        logger.error("Error getting system info: %s", str(e), exc_info=True)
-        # Return basic info if full info fails
-        return {
-            "hostname": socket.gethostname(),
-            "platform": platform.system(),
-            "error": str(e)
-        }
+    return _static_info
 
 def get_machine_id() -> str:
     """
-    Get a unique identifier for this machine.
+    Get a unique identifier for this machine, looking it up on the first call.
+    
+    Returns:
+        str: Machine ID
+    """
+    global _machine_id
+    
+    if _machine_id is None:
+        _machine_id = _read_machine_id()
+    return _machine_id
+
+def _read_machine_id() -> str:
+    """
+    Look up a unique identifier for this machine.
     
     Returns:
         str: Machine ID
@@ -95,21 +198,32 @@ def get_machine_id() -> str:
                     return winreg.QueryValueEx(key, "ProductId")[0]
             except Exception:
                 # Fall back to MAC address
-                mac = uuid.getnode()
-                return ':'.join(("%012X" % mac)[i:i+2] for i in range(0, 12, 2))
+                return _mac_address()
         
         elif platform.system() == 'Linux':
-            # Try to get machine ID from /etc/machine-id
-            if os.path.isfile('/etc/machine-id'):
-                with open('/etc/machine-id', 'r') as f:
-                    return f.read().strip()
+            # Try to get machine ID from /etc/machine-id (32 hex digits and a
+            # newline), with a single unbuffered read
+            try:
+                with open('/etc/machine-id', 'rb', buffering=0) as f:
+                    machine_id = f.read(64).strip().decode('ascii')
+                if machine_id:
+                    return machine_id
+            except (OSError, UnicodeDecodeError):
+                pass
             
             # Fall back to MAC address
-            mac = uuid.getnode()
-            return ':'.join(("%012X" % mac)[i:i+2] for i in range(0, 12, 2))
+            return _mac_address()
         
         elif platform.system() == 'Darwin':  # macOS
-            # Try to get the hardware UUID
+            # Try to get the hardware UUID, from IOKit directly
+            try:
+                platform_uuid = _darwin_platform_uuid()
+                if platform_uuid:
+                    return platform_uuid
+            except Exception as e:
+                logger.debug("Couldn't read the hardware UUID from IOKit: %s", e)
+            
+            # Or from the ioreg tool
             try:
                 import subprocess
                 result = subprocess.run(['ioreg', '-rd1', '-c', 'IOPlatformExpertDevice'],
@@ -121,16 +235,78 @@ def get_machine_id() -> str:
                 pass
             
             # Fall back to MAC address
-            mac = uuid.getnode()
-            return ':'.join(("%012X" % mac)[i:i+2] for i in range(0, 12, 2))
+            return _mac_address()
         
         # Default fallback
         return str(uuid.getnode())
     
     except Exception as e:
-        logger.error("Error getting machine ID: %s", str(e), exc_info=True)
+        logger.error("Error getting machine ID: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return str(uuid.uuid4())
 
+def _darwin_platform_uuid() -> Optional[str]:
+    """
+    Read the hardware UUID of a Mac from IOKit through ctypes, which is what
+    ioreg reports, without starting a process.
+    
+    Returns:
+        Optional[str]: Hardware UUID, or None if there is none
+    """
+    import ctypes
+    
+    iokit = ctypes.CDLL("/System/Library/Frameworks/IOKit.framework/IOKit")
+    cf = ctypes.CDLL("/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation")
+    
+    iokit.IOServiceMatching.restype = ctypes.c_void_p
+    iokit.IOServiceMatching.argtypes = [ctypes.c_char_p]
+    iokit.IOServiceGetMatchingService.restype = ctypes.c_uint32
+    iokit.IOServiceGetMatchingService.argtypes = [ctypes.c_uint32, ctypes.c_void_p]
+    iokit.IORegistryEntryCreateCFProperty.restype = ctypes.c_void_p
+    iokit.IORegistryEntryCreateCFProperty.argtypes = [
+        ctypes.c_uint32, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint32
+    ]
+    iokit.IOObjectRelease.argtypes = [ctypes.c_uint32]
+    cf.CFStringCreateWithCString.restype = ctypes.c_void_p
+    cf.CFStringCreateWithCString.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_uint32]
+    cf.CFStringGetCString.restype = ctypes.c_bool
+    cf.CFStringGetCString.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_long, ctypes.c_uint32]
+    cf.CFRelease.argtypes = [ctypes.c_void_p]
+    
+    utf8 = 0x08000100  # kCFStringEncodingUTF8
+    
+    # The matching dictionary is released by IOServiceGetMatchingService; port
+    # 0 is the default main port
+    service = iokit.IOServiceGetMatchingService(0, iokit.IOServiceMatching(b"IOPlatformExpertDevice"))
+    if not service:
+        return None
+    try:
+        key = cf.CFStringCreateWithCString(None, b"IOPlatformUUID", utf8)
+        try:
+            value = iokit.IORegistryEntryCreateCFProperty(service, key, None, 0)
+        finally:
+            cf.CFRelease(key)
+        if not value:
+            return None
+        try:
+            buffer = ctypes.create_string_buffer(64)
+            if not cf.CFStringGetCString(value, buffer, len(buffer), utf8):
+                return None
+            return buffer.value.decode("utf-8")
+        finally:
+            cf.CFRelease(value)
+    finally:
+        iokit.IOObjectRelease(service)
+
+def _mac_address() -> str:
+    """
+    Get the MAC address of this machine, as the fallback machine ID.
+    
+    Returns:
+        str: MAC address (e.g. "01:23:45:67:89:AB")
+    """
+    mac = f"{uuid.getnode():012X}"
+    return f"{mac[0:2]}:{mac[2:4]}:{mac[4:6]}:{mac[6:8]}:{mac[8:10]}:{mac[10:12]}"
+
 def get_cpu_frequency() -> float:
     """
     Get CPU frequency in MHz.
@@ -138,34 +314,88 @@ def get_cpu_frequency() -> float:
     Returns:
         float: CPU frequency
     """
+    global _cpu_frequency_reader
+    
     try:
-        cpu_freq = psutil.cpu_freq()
-        if cpu_freq and cpu_freq.current:
-            return cpu_freq.current
-        
-        # Fallback for systems where psutil can't get CPU frequency
-        if platform.system() == 'Windows':
-            import winreg
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
-                              r"HARDWARE\DESCRIPTION\System\CentralProcessor\0") as key:
-                return float(winreg.QueryValueEx(key, "~MHz")[0])
-        
-        elif platform.system() == 'Linux':
-            try:
-                with open('/proc/cpuinfo', 'r') as f:
-                    for line in f:
-                        if line.startswith('cpu MHz') or line.startswith('clock'):
-                            return float(line.split(':')[1].strip())
-            except Exception:
-                pass
-        
-        # Default fallback
-        return 0.0
+        # Where the frequency can be read from is worked out on the first call
+        if _cpu_frequency_reader is None:
+            _cpu_frequency_reader = _pick_cpu_frequency_reader()
+        return _cpu_frequency_reader()
     
     except Exception as e:
-        logger.error("Error getting CPU frequency: %s", str(e), exc_info=True)
+        logger.error("Error getting CPU frequency: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return 0.0
 
+def _pick_cpu_frequency_reader() -> Callable[[], float]:
+    """
+    Choose how to read the CPU frequency on this system: through psutil if
+    it reports it, else from the platform's own source.
+    
+    Returns:
+        Callable[[], float]: Function returning the CPU frequency in MHz
+    """
+    try:
+        cpu_freq = psutil.cpu_freq()
+        if cpu_freq and cpu_freq.current:
+            return _cpu_frequency_psutil
+    except Exception:
+        pass
+    
+    # Fallback for systems where psutil can't get CPU frequency
+    if platform.system() == 'Windows':
+        return _cpu_frequency_registry
+    elif platform.system() == 'Linux':
+        return _cpu_frequency_cpuinfo
+    
+    # Default fallback
+    return lambda: 0.0
+
+def _cpu_frequency_psutil() -> float:
+    """
+    Get CPU frequency in MHz from psutil.
+    
+    Returns:
+        float: CPU frequency
+    """
+    cpu_freq = psutil.cpu_freq()
+    return cpu_freq.current if cpu_freq else 0.0
+
+def _cpu_frequency_registry() -> float:
+    """
+    Get CPU frequency in MHz from the Windows registry.
+    
+    Returns:
+        float: CPU frequency
+    """
+    global _cpu0_key
+    
+    import winreg
+    if _cpu0_key is None:
+        _cpu0_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
+                                   r"HARDWARE\DESCRIPTION\System\CentralProcessor\0")
+        atexit.register(_cpu0_key.Close)
+    return float(winreg.QueryValueEx(_cpu0_key, "~MHz")[0])
+
+def _cpu_frequency_cpuinfo() -> float:
+    """
+    Get CPU frequency in MHz from /proc/cpuinfo.
+    
+    Returns:
+        float: CPU frequency
+    """
+    try:
+        # The first processor's entry, which has its frequency, fits in the
+        # first block; only complete lines are parsed
+        with open('/proc/cpuinfo', 'rb', buffering=0) as f:
+            data = f.read(4096)
+        for line in data[:data.rfind(b'\n')].split(b'\n'):
+            if line.startswith((b'cpu MHz', b'clock')):
+                # E.g. "clock : 3000.000000MHz" on POWER
+                return float(line.split(b':')[1].strip().rstrip(b'MHz'))
+    except Exception:
+        pass
+    return 0.0
+
 def get_disk_info() -> Dict[str, Any]:
     """
     Get disk information.
@@ -174,34 +404,69 @@ def get_disk_info() -> Dict[str, Any]:
         Dict[str, Any]: Disk information
     """
     try:
-        disks = {}
+        # Get partitions, skipping those whose usage can't be read or means
+        # nothing, rather than failing on them
+        partitions = [
+            partition for partition in _cached("disk_partitions", psutil.disk_partitions)
+            if partition.fstype not in SKIPPED_FSTYPES and "cdrom" not in partition.opts
+        ]
         
-        # Get partitions
-        partitions = psutil.disk_partitions()
-        
-        for partition in partitions:
-            try:
-                usage = psutil.disk_usage(partition.mountpoint)
-                
-                disks[partition.mountpoint] = {
-                    "device": partition.device,
-                    "fstype": partition.fstype,
-                    "opts": partition.opts,
-                    "total_gb": usage.total / (1024**3),
-                    "used_gb": usage.used / (1024**3),
-                    "free_gb": usage.free / (1024**3),
-                    "percent_used": usage.percent
-                }
-            except Exception as e:
-                logger.debug("Error getting disk info for %s: %s", 
-                           partition.mountpoint, str(e))
+        # Query the partitions' usage concurrently
+        if len(partitions) > 1:
+            workers = min(DISK_PROBE_WORKERS, len(partitions))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sysinfo-disk") as executor:
+                usages = list(executor.map(_get_partition_info, partitions))
+        else:
+            usages = [_get_partition_info(partition) for partition in partitions]
         
-        return disks
+        return {
+            partition.mountpoint: usage
+            for partition, usage in zip(partitions, usages)
+            if usage is not None
+        }
     
     except Exception as e:
-        logger.error("Error getting disk info: %s", str(e), exc_info=True)
+        logger.error("Error getting disk info: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return {}
 
+def _get_partition_info(partition) -> Optional[Dict[str, Any]]:
+    """
+    Get the usage of a disk partition.
+    
+    Args:
+        partition: Partition from psutil.disk_partitions()
+        
+    Returns:
+        Optional[Dict[str, Any]]: Partition information, or None if its usage
+            couldn't be read
+    """
+    try:
+        if hasattr(os, "statvfs"):
+            # The same figures as psutil.disk_usage(), straight from statvfs
+            st = os.statvfs(partition.mountpoint)
+            total = st.f_blocks * st.f_frsize
+            free = st.f_bavail * st.f_frsize
+            used = (st.f_blocks - st.f_bfree) * st.f_frsize
+            # Percentage of the space available to unprivileged users
+            user_total = used + free
+            percent = round(used / user_total * 100, 1) if user_total else 0.0
+        else:
+            usage = psutil.disk_usage(partition.mountpoint)
+            total, used, free, percent = usage.total, usage.used, usage.free, usage.percent
+        
+        return {
+            "device": partition.device,
+            "fstype": partition.fstype,
+            "opts": partition.opts,
+            "total_gb": total / (1024**3),
+            "used_gb": used / (1024**3),
+            "free_gb": free / (1024**3),
+            "percent_used": percent
+        }
+    except Exception as e:
+        logger.debug("Error getting disk info for %s: %s", partition.mountpoint, e)
+        return None
+
 def get_network_interfaces() -> Dict[str, Any]:
     """
     Get network interface information.
@@ -213,49 +478,78 @@ def get_network_interfaces() -> Dict[str, Any]:
         interfaces = {}
         
         # Get network addresses for each interface
-        addrs = psutil.net_if_addrs()
+        addrs = _cached("net_if_addrs", psutil.net_if_addrs)
         
         for interface_name, addr_list in addrs.items():
-            interfaces[interface_name] = []
+            interfaces[interface_name] = addr_infos = []
+            append = addr_infos.append
             
             for addr in addr_list:
+                family = _family_names.get(addr.family)
+                if family is None:
+                    family = _family_names[addr.family] = str(addr.family)
+                
                 addr_info = {
-                    "family": str(addr.family),
+                    "family": family,
                     "address": addr.address
                 }
                 
-                if addr.netmask:
-                    addr_info["netmask"] = addr.netmask
+                netmask = addr.netmask
+                if netmask:
+                    addr_info["netmask"] = netmask
                 
-                if addr.broadcast:
-                    addr_info["broadcast"] = addr.broadcast
+                broadcast = addr.broadcast
+                if broadcast:
+                    addr_info["broadcast"] = broadcast
                 
-                interfaces[interface_name].append(addr_info)
+                append(addr_info)
         
         return interfaces
     
     except Exception as e:
-        logger.error("Error getting network interfaces: %s", str(e), exc_info=True)
+        logger.error("Error getting network interfaces: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return {}
 
 def get_ip_address() -> str:
     """
     Get the primary IP address of this machine.
     
+    No DNS lookups are made, so this never blocks on a misconfigured resolver.
+    The address is looked up again at most every IP_ADDRESS_CACHE_TTL seconds.
+    
+    Returns:
+        str: Primary IP address
+    """
+    return _cached("ip_address", _find_ip_address, IP_ADDRESS_CACHE_TTL)
+
+def _find_ip_address() -> str:
+    """
+    Find the primary IP address of this machine.
+    
     Returns:
         str: Primary IP address
     """
     try:
-        # This creates a socket but doesn't actually establish a connection
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))  # Google's DNS server
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
+        # This creates a socket but doesn't actually establish a connection;
+        # the address is that of the interface with the default route
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            # Connecting a UDP socket only looks up the route, but never let
+            # it stall the caller
+            s.settimeout(0.05)
+            s.connect(("8.8.8.8", 80))  # Google's DNS server
+            return s.getsockname()[0]
     except Exception:
-        # Fallback to hostname resolution
+        # Fallback to the first routable IPv4 address of an interface that is up
         try:
-            host_name = socket.gethostname()
-            return socket.gethostbyname(host_name)
+            stats = psutil.net_if_stats()
+            for interface_name, addr_list in _cached("net_if_addrs", psutil.net_if_addrs).items():
+                if interface_name in stats and not stats[interface_name].isup:
+                    continue
+                for addr in addr_list:
+                    if (addr.family == socket.AF_INET
+                            and not addr.address.startswith(("127.", "169.254."))):
+                        return addr.address
         except Exception:
-            return "127.0.0.1"  # Localhost if all else fails
\ No newline at end of file
+            pass
+        
+        return "127.0.0.1"  # Localhost if all else fails
\ No newline at end of file
@@ -41,6 +41,11 @@ SERVICE_NAME = "GoPineNodeAgent"
 SERVICE_DISPLAY_NAME = "GoPine Node Agent"
 SERVICE_DESCRIPTION = "Background processing agent for the GoPine distributed computing system"
 
+# Service data directory, with its log file and default configuration
+SERVICE_DATA_DIR = os.path.join(os.environ.get("PROGRAMDATA", "C:\\ProgramData"), "GoPine")
+SERVICE_LOG_FILE = os.path.join(SERVICE_DATA_DIR, "logs", "gopine-node-agent.log")
+SERVICE_CONFIG_FILE = os.path.join(SERVICE_DATA_DIR, "config.yaml")
+
 class NodeAgentService(win32serviceutil.ServiceFramework):
     """
     Windows service implementation for the GoPine Node Agent.
@@ -104,20 +109,20 @@ class NodeAgentService(win32serviceutil.ServiceFramework):
         
         try:
             # Import here to avoid circular imports
+            from gopine_node_agent.cli import limit_ocr_threads
             from gopine_node_agent.core.agent import NodeAgent
             from gopine_node_agent.core.logger import setup_logging
             
             # Set up logging
-            log_dir = os.path.join(os.environ.get("PROGRAMDATA", "C:\\ProgramData"), "GoPine", "logs")
-            os.makedirs(log_dir, exist_ok=True)
-            log_file = os.path.join(log_dir, "gopine-node-agent.log")
-            setup_logging(level=logging.INFO, log_file=log_file)
+            os.makedirs(os.path.dirname(SERVICE_LOG_FILE), exist_ok=True)
+            setup_logging(level=logging.INFO, log_file=SERVICE_LOG_FILE)
+            
+            # The installed service is started by pythonservice.exe, not
+            # through cli.main(), so the OCR thread limit is set here too
+            limit_ocr_threads()
             
             # Get config from environment or default location
-            config_path = os.environ.get(
-                "GOPINE_CONFIG",
-                os.path.join(os.environ.get("PROGRAMDATA", "C:\\ProgramData"), "GoPine", "config.yaml")
-            )
+            config_path = os.environ.get("GOPINE_CONFIG", SERVICE_CONFIG_FILE)
             
             # Create and start the node agent
             self.agent = NodeAgent(config_path=config_path)
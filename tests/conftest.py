@@ -0,0 +1,8 @@
+"""
+Test configuration: run the tests against the package sources under src/.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,59 @@
+"""
+Tests for the image preprocessing utilities.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+from gopine_node_agent.utils import image_processing
+
+def _skewed_page(angle: float) -> "Image.Image":
+    """
+    Draw a grayscale page of text-like lines and rotate it.
+    
+    Args:
+        angle (float): Rotation in degrees, counter-clockwise
+        
+    Returns:
+        Image.Image: Rotated page
+    """
+    page = Image.new("L", (800, 1000), 255)
+    draw = ImageDraw.Draw(page)
+    for y in range(100, 900, 40):
+        draw.rectangle((100, y, 700, y + 12), fill=0)
+    return page.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+@pytest.fixture
+def cv2_fallback(monkeypatch):
+    """Run the deskewing code with the fallback used when OpenCV is missing."""
+    monkeypatch.setattr(image_processing, "cv2", image_processing.cv2)
+    monkeypatch.setattr(image_processing, "_HAVE_OPENCV", False)
+    image_processing._create_cv2_fallback()
+
+@pytest.mark.parametrize("angle", [5, -5, 2, -8])
+def test_estimate_skew_angle_without_opencv(cv2_fallback, angle):
+    # Rotating the page by the estimate straightens it
+    assert image_processing._estimate_skew_angle(_skewed_page(angle)) == pytest.approx(-angle, abs=0.5)
+
+def test_estimate_skew_angle_without_opencv_blank_page(cv2_fallback):
+    assert image_processing._estimate_skew_angle(Image.new("L", (800, 1000), 255)) is None
+
+def test_estimate_skew_angle_without_opencv_narrows_points(cv2_fallback, monkeypatch):
+    min_area_rect = image_processing.cv2.minAreaRect
+    seen = []
+    
+    def spy(points):
+        seen.append(points)
+        return min_area_rect(points)
+    
+    monkeypatch.setattr(image_processing.cv2, "minAreaRect", spy)
+    angle = image_processing._estimate_skew_angle(_skewed_page(3))
+    
+    # (x, y) points, narrowed to int32 like cv2.findNonZero returns them
+    points, = seen
+    assert points.dtype == np.int32
+    assert points.ndim == 2 and points.shape[1] == 2
+    assert angle == pytest.approx(-3, abs=0.5)